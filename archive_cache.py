@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from version_index import file_sha256
+
+CACHE_DIRNAME = ".archive_cache"
+INDEX_FILENAME = "index.json"
+
+
+class ArchiveCache:
+    """
+    Content-addressed store of downloaded BIOS archives under
+    folder/objects/<sha256>.zip. An archive is found again by its SHA-256, its
+    download URL or its model and version, so a BIOS shared by several models
+    or downloaded again after its images were deleted is extracted from disk.
+    Least recently used archives are evicted once the total exceeds max_bytes,
+    except those handed out by lookup() or store() and not unpinned yet.
+    """
+    def __init__(self, folder: str, max_bytes: int):
+        self.folder = os.path.abspath(folder)
+        self.max_bytes = max_bytes
+        self.path = os.path.join(self.folder, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        # sha256 -> {"size", "last_used"}; key -> sha256
+        self.objects = {}
+        self.keys = {}
+        self._pins = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.objects = data.get("objects", {})
+            self.keys = data.get("keys", {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def release_keys(release):
+        keys = [f"version:{release.model.upper()}:{release.version}"]
+        if release.download_url:
+            keys.append(f"url:{release.download_url}")
+        return keys
+
+    def object_path(self, sha256: str):
+        return os.path.join(self.folder, "objects", sha256[:2], sha256 + ".zip")
+
+    def owns(self, path: str):
+        return os.path.abspath(path).startswith(self.folder + os.sep)
+
+    def _find(self, release):
+        for key in self.release_keys(release):
+            sha256 = self.keys.get(key)
+            if sha256 is None:
+                continue
+            if sha256 in self.objects and os.path.exists(self.object_path(sha256)):
+                return sha256
+            # Evicted or deleted behind our back
+            self._drop(sha256)
+        return None
+
+    def has(self, release):
+        with self._lock:
+            return self._find(release) is not None
+
+    def lookup(self, release):
+        """
+        Path of the cached archive of release, or None. The archive stays
+        pinned against eviction until unpin(path).
+        """
+        with self._lock:
+            sha256 = self._find(release)
+            if sha256 is None:
+                return None
+            self.objects[sha256]["last_used"] = time.time()
+            self._pins[sha256] = self._pins.get(sha256, 0) + 1
+            return self.object_path(sha256)
+
+    def unpin(self, path: str):
+        sha256 = self._sha256_of(path)
+        with self._lock:
+            count = self._pins.get(sha256, 0) - 1
+            if count > 0:
+                self._pins[sha256] = count
+            else:
+                self._pins.pop(sha256, None)
+            self._evict()
+
+    def store(self, path: str, release):
+        """
+        Move a downloaded archive into the cache (or drop it when the same
+        content is already there) and return its path in the cache, pinned
+        like lookup().
+        """
+        sha256 = file_sha256(path)
+        target = self.object_path(sha256)
+        with self._lock:
+            if os.path.exists(target):
+                os.remove(path)
+                logging.info(f"Archive {os.path.basename(path)} already cached as {sha256[:12]}")
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.replace(path, target)
+                except OSError:
+                    # Cache on another file system than the staging folder
+                    shutil.move(path, target)
+            self.objects[sha256] = {"size": os.path.getsize(target), "last_used": time.time()}
+            for key in self.release_keys(release):
+                self.keys[key] = sha256
+            self._pins[sha256] = self._pins.get(sha256, 0) + 1
+            self._evict()
+            self._save()
+        return target
+
+    @staticmethod
+    def _sha256_of(path: str):
+        return os.path.basename(path)[:-len(".zip")]
+
+    def discard(self, path: str):
+        """Forget a cached archive that turned out to be corrupt."""
+        sha256 = self._sha256_of(path)
+        with self._lock:
+            self._pins.pop(sha256, None)
+            self._drop(sha256)
+            self._save()
+
+    def _drop(self, sha256: str):
+        self.objects.pop(sha256, None)
+        for key in [key for key, value in self.keys.items() if value == sha256]:
+            del self.keys[key]
+        try:
+            os.remove(self.object_path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self.objects.values())
+        for sha256, entry in sorted(self.objects.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if sha256 in self._pins:
+                continue
+            total -= entry["size"]
+            self._drop(sha256)
+            logging.info(f"Evicted cached archive {sha256[:12]} ({entry['size']} bytes)")
+
+    def _save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"objects": self.objects, "keys": self.keys}, f)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_archive_cache(folder: str, max_bytes: int):
+    """Shared ArchiveCache for folder, loaded once per process."""
+    key = os.path.abspath(folder)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ArchiveCache(folder, max_bytes)
+            _caches[key] = cache
+        cache.max_bytes = max_bytes
+        return cache
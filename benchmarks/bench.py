@@ -0,0 +1,231 @@
+"""
+Offline benchmark of a full run against a local mock of the ASUS support
+site, e.g.
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --scenarios 100 --mode browser --latency-ms 50 --output bench.json
+
+Every scenario runs in its own process and temporary working directory, so
+the logs, the BIOS folder and the version caches start empty and peak RSS
+is per scenario. Reports per-model latency p50/p95, throughput, peak RSS and
+the cost of the local folder scans.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def write_model_list(path: str, models, duplicates: int = 1):
+    with open(path, "w") as f:
+        for _ in range(duplicates):
+            for i, model in enumerate(models):
+                f.write(f"AS {model} 2024/01/{i % 28 + 1:02d} LOT{i:06d}\n")
+
+
+def legacy_version_scan(model: str, folder: str, parse):
+    # What get_bios_version_for_model did before the version index: list the folder per lookup
+    for filename in os.listdir(folder):
+        if filename.lower().startswith(model.lower()):
+            version = parse(filename)
+            if version is not None:
+                return version
+    return None
+
+
+def measure_scans(bios_core, version_index, models, history: int, base_version: int):
+    """Time retrieve_model_list and the installed-version lookups on a populated folder."""
+    write_model_list("scan_models.txt", models, duplicates=3)
+    started = time.perf_counter()
+    listed = bios_core.retrieve_model_list("scan_models.txt")
+    model_list_seconds = time.perf_counter() - started
+
+    folder = os.path.abspath("scan_bios")
+    os.makedirs(folder, exist_ok=True)
+    for model in models:
+        for version in range(base_version, base_version + history):
+            open(os.path.join(folder, f"{model}AS.{version}"), "wb").close()
+        open(os.path.join(folder, f"{model}.txt"), "wb").close()
+
+    sample = models[:200]
+    started = time.perf_counter()
+    for model in sample:
+        legacy_version_scan(model, folder, version_index.extract_bios_version_from_filename)
+    legacy_seconds = (time.perf_counter() - started) / len(sample)
+
+    started = time.perf_counter()
+    index = version_index.VersionIndex(folder)
+    index.rebuild()
+    cold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for model in models:
+        bios_core.get_bios_version_for_model(model, folder)
+    warm_seconds = (time.perf_counter() - started) / len(models)
+
+    return {
+        "files": len(os.listdir(folder)),
+        "retrieve_model_list_seconds": round(model_list_seconds, 6),
+        "model_list_lines": len(models) * 3,
+        "model_list_unique": len(listed),
+        "legacy_listdir_lookup_seconds": round(legacy_seconds, 6),
+        "index_cold_build_seconds": round(cold_seconds, 6),
+        "index_warm_lookup_seconds": round(warm_seconds, 6),
+    }
+
+
+def run_scenario(spec):
+    """Body of the child process: run one scenario in the current directory."""
+    sys.path[:0] = [REPO_DIR, BENCH_DIR]
+    from mock_site import MockAsusSite, model_name
+
+    site = MockAsusSite(zip_size=spec["zip_size"], history=spec["history"], latency=spec["latency_ms"] / 1000.0,
+                        max_rps=spec["site_max_rps"])
+    with site:
+        models = [model_name(n) for n in range(spec["models"])]
+        write_model_list("models.txt", models)
+        config = {
+            "chromedriver": "chromedriver",
+            "model_list": "models.txt",
+            "logs": "logs",
+            "download_path": "BIOS",
+            "workers": spec["workers"],
+            "resolver": "selenium" if spec["mode"] == "browser" else "http",
+            "asus_base_url": site.url,
+            "remote_cache_ttl_hours": 0,
+        }
+        config.update(spec["config"])
+        os.makedirs("logs", exist_ok=True)
+        with open("config.json", "w") as f:
+            json.dump(config, f)
+
+        import bios_core
+        import version_index
+        bios_core.configure()
+        from fake_driver import FakeDriver
+        from run_metrics import percentile, phase_summary
+
+        # Nothing reads the log during a benchmark; keep the handler from dominating the profile
+        bios_core.logging.getLogger().setLevel(bios_core.logging.WARNING)
+
+        results = bios_core.RunResults()
+        latencies = []
+        started = time.perf_counter()
+        with bios_core.create_driver_pool(driver_factory=FakeDriver) as pool:
+            for job in bios_core.run_models(models, bios_core.DOWNLOAD_PATH, pool, results=results):
+                latencies.append(sum(seconds for phase, seconds in job.timings.items()
+                                     if phase in ("resolve", "download", "extract", "index")))
+        elapsed = time.perf_counter() - started
+        downloaded = sum(job.bytes_downloaded for job in results.jobs)
+        statuses = {}
+        for job in results.jobs:
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+
+        report = {
+            "scenario": spec,
+            "seconds": round(elapsed, 3),
+            "statuses": statuses,
+            "http_requests": site.requests,
+            "http_throttled": site.throttled,
+            "models_per_second": round(len(models) / elapsed, 2),
+            "mb_per_second": round(downloaded / (1024 * 1024) / elapsed, 2),
+            "model_latency_p50": round(percentile(latencies, 50), 4),
+            "model_latency_p95": round(percentile(latencies, 95), 4),
+            "phases": phase_summary(results.jobs),
+            "scans": measure_scans(bios_core, version_index, models, spec["history"], site.base_version),
+        }
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def spawn(spec):
+    with tempfile.TemporaryDirectory(prefix="bios-bench-") as workdir:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", json.dumps(spec)],
+            cwd=workdir, check=True, stdout=subprocess.PIPE, universal_newlines=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_override(text: str):
+    if "=" not in text:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {text!r}")
+    key, value = text.split("=", 1)
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key.strip(), value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a full run against a local mock of the ASUS support site.")
+    parser.add_argument("--scenarios", default="10,100,1000", help="comma separated model counts (default: 10,100,1000)")
+    parser.add_argument("--mode", choices=("http", "browser", "both"), default="http",
+                        help="resolve over HTTP or through the fake Selenium driver (default: http)")
+    parser.add_argument("--workers", type=int, default=4, help="resolve workers / browser sessions (default: 4)")
+    parser.add_argument("--zip-size", type=int, default=256 * 1024, help="BIOS image size in bytes (default: 256 KiB)")
+    parser.add_argument("--history", type=int, default=3, help="published versions per model (default: 3)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per page/API response")
+    parser.add_argument("--site-max-rps", type=float, default=0,
+                        help="make the mock site answer 429 beyond this many requests per second")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        type=parse_override,
+                        help="config value for the runs (VALUE is parsed as JSON when possible), "
+                             "e.g. rate_limits='{\"default\": {\"rate\": 20}}'; repeatable")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(run_scenario(json.loads(args.child))))
+        return 0
+
+    modes = ("http", "browser") if args.mode == "both" else (args.mode,)
+    reports = []
+    for mode in modes:
+        for count in (int(n) for n in args.scenarios.split(",") if n.strip()):
+            spec = {"models": count, "mode": mode, "workers": args.workers, "zip_size": args.zip_size,
+                    "history": args.history, "latency_ms": args.latency_ms, "site_max_rps": args.site_max_rps,
+                    "config": dict(args.overrides)}
+            report = spawn(spec)
+            reports.append(report)
+            scans = report["scans"]
+            print(f"{mode:<8}{count:>6} models  {report['seconds']:>8.2f}s  "
+                  f"{report['models_per_second']:>8.1f} models/s  {report['mb_per_second']:>7.1f} MB/s  "
+                  f"p50 {report['model_latency_p50']:.3f}s  p95 {report['model_latency_p95']:.3f}s  "
+                  f"rss {report['peak_rss_mb']} MB  "
+                  f"lookup {scans['legacy_listdir_lookup_seconds'] * 1e6:.0f}us -> "
+                  f"{scans['index_warm_lookup_seconds'] * 1e6:.1f}us", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+    else:
+        print(json.dumps(reports, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Selenium stand-in for benchmarks. Loads pages from the mock site over plain
+HTTP, builds a tiny DOM and answers BIOS_ROWS_SCRIPT over it, and
+"downloads" like Chrome does: a .crdownload file renamed into the directory
+set through Page.setDownloadBehavior.
+"""
+import os
+import re
+import threading
+import urllib.request
+from html.parser import HTMLParser
+
+from bios_page import BIOS_ROWS_SCRIPT
+
+VOID_TAGS = {"br", "hr", "img", "input", "link", "meta"}
+
+
+class FakeElement:
+    def __init__(self, driver, tag, attrs, parent=None):
+        self.driver = driver
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self._text = []
+
+    def get_attribute(self, name):
+        return self.attrs.get(name)
+
+    def has_class(self, fragment):
+        return fragment in (self.attrs.get("class") or "")
+
+    @property
+    def text(self):
+        parts = [t.strip() for t in self._text if t.strip()]
+        parts += [child.text for child in self.children if child.text]
+        return "\n".join(parts)
+
+    def descendants(self):
+        for child in self.children:
+            yield child
+            yield from child.descendants()
+
+    def click(self):
+        href = self.attrs.get("data-href") or self.attrs.get("href")
+        if href:
+            self.driver._start_download(href)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, driver):
+        super().__init__()
+        self.root = FakeElement(driver, "#document", {})
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        element = FakeElement(self.root.driver, tag, dict(attrs), self._stack[-1])
+        self._stack[-1].children.append(element)
+        if tag not in VOID_TAGS:
+            self._stack.append(element)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                break
+
+    def handle_data(self, data):
+        if self._stack[-1].tag != "script":
+            self._stack[-1]._text.append(data)
+
+
+# One step of the relative XPaths _walk follows, e.g. div[contains(@class,'x')]
+_XPATH_STEP = re.compile(r"^(\w+)\[contains\(@class,'([^']+)'\)\]$")
+
+
+class FakeDriver:
+    """Enough of selenium's WebDriver for resolve_with_browser and bios_page."""
+    def __init__(self, driver_path=None):
+        self.driver_path = driver_path
+        self.download_dir = None
+        self.current_url = None
+        self.document = None
+        self.page_loads = 0
+        self._quit = False
+        self._downloads = []
+
+    @property
+    def window_handles(self):
+        if self._quit:
+            raise RuntimeError("Browser has been closed")
+        return ["main"]
+
+    def maximize_window(self):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Page.setDownloadBehavior":
+            self.download_dir = params["downloadPath"]
+        return {}
+
+    def get(self, url):
+        if self._quit:
+            raise RuntimeError("Browser has been closed")
+        with urllib.request.urlopen(url) as response:
+            html = response.read().decode("utf-8")
+        builder = _TreeBuilder(self)
+        builder.feed(html)
+        self.document = builder.root
+        self.current_url = url
+        self.page_loads += 1
+
+    def execute_script(self, script, *args):
+        if script == BIOS_ROWS_SCRIPT:
+            return self._bios_rows(args[0])
+        return None
+
+    def quit(self):
+        self._quit = True
+        for thread in self._downloads:
+            thread.join()
+
+    def _bios_rows(self, section):
+        # Python rendition of BIOS_ROWS_SCRIPT over the fake DOM
+        rows = []
+        for left in (e for e in self.document.descendants() if e.tag == "div" and e.has_class("ProductSupportDriverBIOS__contentLeft")):
+            for title in (d for d in left.descendants() if d.tag == "div"):
+                siblings = title.parent.children
+                following = siblings[siblings.index(title) + 1:]
+                if section not in title.text or not following:
+                    continue
+                cells = [cell.text for cell in following[0].children]
+                version = next((c[len("Version"):].strip() for c in cells if c.startswith("Version")), None)
+                if version is None:
+                    continue
+                buttons = self._walk([title], ["..", "..", "div[contains(@class,'ProductSupportDriverBIOS__contentRight')]",
+                                               "div[contains(@class,'ProductSupportDriverBIOS__downloadBtn__')]"])
+                rows.append({
+                    "title": title.text,
+                    "version": version,
+                    "date": next((c for c in cells if re.search(r"\d{4}/\d{1,2}/\d{1,2}", c)), ""),
+                    "size": next((c for c in cells if re.search(r"\d\s*[KMG]?B(ytes)?$", c, re.I)), ""),
+                    "url": buttons[0].attrs.get("data-href", "") if buttons else "",
+                    "button": buttons[0] if buttons else None,
+                })
+                break
+        return rows
+
+    def _walk(self, current, steps):
+        for step in steps:
+            if step == "..":
+                current = [e.parent for e in current if e.parent is not None]
+                continue
+            match = _XPATH_STEP.match(step)
+            tag, fragment = match.groups() if match else (step, None)
+            current = [c for e in current for c in e.children
+                       if c.tag == tag and (fragment is None or c.has_class(fragment))]
+        return current
+
+    def _start_download(self, url):
+        thread = threading.Thread(target=self._download, args=(url, self.download_dir), daemon=True)
+        self._downloads.append(thread)
+        thread.start()
+
+    def _download(self, url, folder):
+        name = os.path.basename(url.split("?", 1)[0])
+        partial = os.path.join(folder, name + ".crdownload")
+        with urllib.request.urlopen(url) as response, open(partial, "wb") as f:
+            while True:
+                chunk = response.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+        os.replace(partial, os.path.join(folder, name))
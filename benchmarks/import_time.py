@@ -0,0 +1,118 @@
+"""
+Cold-start cost of the entry points, e.g.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 20 --output import_time.json
+
+Every measurement is a fresh interpreter in an empty temporary directory (no
+config.json, no logs folder). Reports the median wall time of importing each
+module and of a complete `bios_cli.py --dry-run` on a small model list, the
+slowest imports as reported by `python -X importtime`, and which of the heavy
+optional modules were loaded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+MODULES = ("bios_core", "bios_cli", "bios_gui")
+HEAVY_MODULES = ("selenium.webdriver", "tkinter", "zipfile", "ctypes")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def python_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def run_python(args, cwd):
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=python_env(), check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def time_import(module: str, repeat: int, cwd: str):
+    samples, loaded = [], []
+    for _ in range(repeat):
+        output = run_python(["-c", PROBE.format(module=module, heavy=HEAVY_MODULES)], cwd).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        loaded = result["loaded"]
+    return {"median_seconds": round(statistics.median(samples), 4), "min_seconds": round(min(samples), 4),
+            "heavy_modules_loaded": loaded}
+
+
+def time_dry_run(repeat: int, cwd: str):
+    with open(os.path.join(cwd, "models.txt"), "w") as f:
+        for i in range(20):
+            f.write(f"AS BX{i:05d} 2024/01/01 LOT{i:06d}\n")
+    args = [os.path.join(REPO_DIR, "bios_cli.py"), "--dry-run", "--model-list", "models.txt",
+            "--set", "download_path=BIOS", "--set", "logs=logs"]
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run_python(args, cwd)
+        samples.append(time.perf_counter() - started)
+    return {"median_seconds": round(statistics.median(samples), 4), "min_seconds": round(min(samples), 4)}
+
+
+def slowest_imports(module: str, cwd: str, top: int):
+    """Modules with the largest cumulative import time, from python -X importtime."""
+    stderr = run_python(["-X", "importtime", "-c", f"import {module}"], cwd).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000.0, 1)} for us, name in rows[:top]]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cold-start time of the entry points.")
+    parser.add_argument("--repeat", type=int, default=10, help="fresh interpreters per measurement (default: 10)")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list per module (default: 10)")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {"python": sys.version.split()[0], "modules": {}}
+    with tempfile.TemporaryDirectory(prefix="bios-import-") as workdir:
+        # Warm the bytecode cache so the first sample does not include compilation
+        run_python(["-c", "import " + ", ".join(MODULES)], workdir)
+        for module in MODULES:
+            result = time_import(module, args.repeat, workdir)
+            result["slowest"] = slowest_imports(module, workdir, args.top)
+            report["modules"][module] = result
+            print(f"import {module:<10} {result['median_seconds'] * 1000:8.1f} ms  "
+                  f"heavy: {', '.join(result['heavy_modules_loaded']) or '-'}", file=sys.stderr)
+        report["cli_dry_run"] = time_dry_run(args.repeat, workdir)
+        print(f"bios_cli.py --dry-run {report['cli_dry_run']['median_seconds'] * 1000:8.1f} ms", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
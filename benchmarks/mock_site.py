@@ -0,0 +1,175 @@
+"""
+Local stand-in for the ASUS support site. Serves helpdesk_bios pages shaped
+like recorded ones, the GetPDBIOS JSON API and synthetic BIOS zips of a
+configurable size, so the scraper can be benchmarked with no network.
+"""
+import collections
+import io
+import json
+import os
+import socket
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BIOS_SECTION_NAME = "BIOS for ASUS EZ Flash Utility"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{model} - Support</title></head>
+<body>
+<div class="ProductSupportDriverBIOS__driverList__a1">
+{items}
+</div>
+<script>window.__BIOS_SECTION__ = {section};</script>
+</body></html>
+"""
+
+ITEM_TEMPLATE = """<div class="ProductSupportDriverBIOS__item__b2">
+  <div class="ProductSupportDriverBIOS__contentLeft__c3">
+    <div class="ProductSupportDriverBIOS__fileTitle__d4">{section} - {title}</div>
+    <div class="ProductSupportDriverBIOS__fileInfo__e5"><div>Version {version}</div><div>{date}</div><div>{size}</div></div>
+  </div>
+  <div class="ProductSupportDriverBIOS__contentRight__f6">
+    <div class="ProductSupportDriverBIOS__downloadBtn__g7" data-href="{url}">Download</div>
+  </div>
+</div>"""
+
+
+def model_name(n: int):
+    return f"BX{n:05d}"
+
+
+class MockAsusSite:
+    """
+    Threaded HTTP server for a fleet of fake models. Every model publishes
+    `history` BIOS versions, newest = base_version + history - 1. latency adds
+    a fixed delay (seconds) to every page and API response. With max_rps, any
+    request beyond that many in the last second gets a 429, like a throttling
+    front end.
+    """
+    def __init__(self, zip_size: int = 256 * 1024, history: int = 3, base_version: int = 300, latency: float = 0.0,
+                 max_rps: float = 0):
+        self.zip_size = zip_size
+        self.history = history
+        self.base_version = base_version
+        self.latency = latency
+        self.max_rps = max_rps
+        self.requests = 0
+        self.throttled = 0
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-asus", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def versions(self, model: str):
+        return list(range(self.base_version + self.history - 1, self.base_version - 1, -1))
+
+    def section(self, model: str):
+        files = []
+        for i, version in enumerate(self.versions(model)):
+            files.append({
+                "Version": str(version),
+                "Title": f"{model} BIOS {version}",
+                "ReleaseDate": f"2024/{12 - i % 12:02d}/01",
+                "FileSize": f"{self.zip_size / 1048576:.2f} MBytes",
+                "DownloadUrl": {"Global": f"{self.url}/pub/bios/{model}AS{version}.zip?model={model}"},
+            })
+        return {"Name": BIOS_SECTION_NAME, "Files": files}
+
+    def page(self, model: str):
+        section = self.section(model)
+        items = "\n".join(
+            ITEM_TEMPLATE.format(section=BIOS_SECTION_NAME, title=f["Title"], version=f["Version"],
+                                 date=f["ReleaseDate"], size=f["FileSize"], url=f["DownloadUrl"]["Global"])
+            for f in section["Files"]
+        )
+        return PAGE_TEMPLATE.format(model=model, items=items, section=json.dumps(section))
+
+    def archive(self, model: str, version: int):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr(f"{model}AS.{version}", os.urandom(self.zip_size))
+            zf.writestr("readme.txt", f"{model} BIOS {version}\r\n")
+            zf.writestr("AFUWINx64/AFUWINx64.EXE", b"MZ" + b"\0" * 1024)
+        return buf.getvalue()
+
+    def admit(self):
+        """Count a request; False when it exceeds max_rps."""
+        with self._lock:
+            self.requests += 1
+            if not self.max_rps:
+                return True
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_rps:
+                self.throttled += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                if not site.admit():
+                    return self._send(429, b"", "text/plain", {"Retry-After": "1"})
+                parts = urlsplit(self.path)
+                segments = [s for s in parts.path.split("/") if s]
+                if parts.path.endswith("/GetPDBIOS"):
+                    model = parse_qs(parts.query).get("model", [""])[0].upper()
+                    time.sleep(site.latency)
+                    body = json.dumps({"Result": {"Count": 1, "Obj": [site.section(model)]}, "Status": "SUCCESS"})
+                    return self._send(200, body.encode("utf-8"), "application/json")
+                if len(segments) == 3 and segments[0] == "supportonly" and segments[2] == "helpdesk_bios":
+                    time.sleep(site.latency)
+                    return self._send(200, site.page(segments[1].upper()).encode("utf-8"), "text/html")
+                if len(segments) == 3 and segments[:2] == ["pub", "bios"] and segments[2].endswith(".zip"):
+                    model, _, version = segments[2][:-4].rpartition("AS")
+                    return self._send(200, site.archive(model, int(version)), "application/zip")
+                self._send(404, b"", "text/plain")
+
+            def _send(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
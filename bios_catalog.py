@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+
+from http_resolver import BIOS_SECTION_NAME, BiosRelease
+
+CATALOG_FILENAME = ".bios_catalog.sqlite3"
+# Longer model selections are filtered after the query instead of in an IN (...) clause
+MAX_IN_PARAMS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    model TEXT PRIMARY KEY,
+    checked_at REAL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS releases (
+    model TEXT NOT NULL,
+    section TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    release_date TEXT NOT NULL DEFAULT '',
+    size TEXT NOT NULL DEFAULT '',
+    download_url TEXT NOT NULL DEFAULT '',
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (model, section, version)
+);
+CREATE INDEX IF NOT EXISTS releases_by_section ON releases (section, model, version);
+"""
+
+# Latest releases first; ROW_NUMBER ranks the versions of each model for `latest`
+SELECT_RELEASES = """
+SELECT model, version, title, release_date, size, download_url, section FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY model ORDER BY version DESC) AS rank
+    FROM releases WHERE {where}
+) {limit} ORDER BY model, version DESC
+"""
+
+
+class BiosCatalog:
+    """
+    SQLite catalog of every BIOS release published for each model (all
+    sections of the support page), filled by one lookup per model and
+    queried to pick releases to download without visiting the pages again.
+    Models are stored upper case. Safe to share between threads.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def model_state(self, model: str):
+        """The models row of model as a dict, or None if it was never looked up."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT checked_at, etag, last_modified, content_hash, error FROM models WHERE model = ?",
+                (model.upper(),)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("checked_at", "etag", "last_modified", "content_hash", "error"), row))
+
+    def is_fresh(self, model: str, ttl: float):
+        state = self.model_state(model)
+        return state is not None and not state["error"] and time.time() - (state["checked_at"] or 0) < ttl
+
+    def record(self, model: str, lookup):
+        """Store the releases of a resolver Lookup; returns how many were new."""
+        now = time.time()
+        model = model.upper()
+        with self._lock, self._db:
+            known = self._db.execute("SELECT COUNT(*) FROM releases WHERE model = ?", (model,)).fetchone()[0]
+            self._db.executemany(
+                "INSERT INTO releases (model, section, version, title, release_date, size, download_url, "
+                "first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (model, section, version) DO UPDATE SET title = excluded.title, "
+                "release_date = excluded.release_date, size = excluded.size, "
+                "download_url = excluded.download_url, last_seen = excluded.last_seen",
+                [(model, r.section, r.version, r.title, r.release_date, r.size, r.download_url, now, now)
+                 for r in lookup.releases])
+            self._upsert_model(model, now, lookup.etag, lookup.last_modified, lookup.content_hash, None)
+            total = self._db.execute("SELECT COUNT(*) FROM releases WHERE model = ?", (model,)).fetchone()[0]
+        return total - known
+
+    def touch(self, model: str):
+        """Mark model as checked when its page did not change."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE models SET checked_at = ?, error = NULL WHERE model = ?",
+                             (time.time(), model.upper()))
+
+    def record_failure(self, model: str, error):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO models (model, checked_at, error) VALUES (?, ?, ?) "
+                "ON CONFLICT (model) DO UPDATE SET checked_at = excluded.checked_at, error = excluded.error",
+                (model.upper(), time.time(), str(error)))
+
+    def _upsert_model(self, model, checked_at, etag, last_modified, content_hash, error):
+        self._db.execute(
+            "INSERT INTO models (model, checked_at, etag, last_modified, content_hash, error) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (model) DO UPDATE SET checked_at = excluded.checked_at, "
+            "etag = excluded.etag, last_modified = excluded.last_modified, "
+            "content_hash = excluded.content_hash, error = excluded.error",
+            (model, checked_at, etag, last_modified, content_hash, error))
+
+    def releases(self, models=None, section=BIOS_SECTION_NAME, latest=None, newer_than=None, since=None):
+        """
+        Catalogued releases, newest first per model: of models (default: all),
+        in section (matched like http_resolver.in_section, as part of the
+        stored name; None: every section), only the `latest` newest versions of
+        each model, versions above newer_than and releases dated on or after
+        since ("YYYY/MM/DD", as listed on the site).
+        """
+        where, params = ["1 = 1"], []
+        if section is not None:
+            where.append("instr(section, ?) > 0")
+            params.append(section)
+        if newer_than is not None:
+            where.append("version > ?")
+            params.append(int(newer_than))
+        if since is not None:
+            where.append("release_date >= ?")
+            params.append(since)
+        wanted = None
+        if models is not None:
+            wanted = {model.upper() for model in models}
+            if not wanted:
+                return []
+            if len(wanted) <= MAX_IN_PARAMS:
+                where.append(f"model IN ({', '.join('?' * len(wanted))})")
+                params.extend(sorted(wanted))
+        limit = ""
+        if latest is not None:
+            limit = "WHERE rank <= ?"
+            params.append(int(latest))
+        query = SELECT_RELEASES.format(where=" AND ".join(where), limit=limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [BiosRelease(model=row[0], version=row[1], title=row[2], release_date=row[3], size=row[4],
+                            download_url=row[5], section=row[6])
+                for row in rows if wanted is None or row[0] in wanted]
+
+    def summary(self):
+        """Counts of models, releases and releases per section."""
+        with self._lock:
+            models = self._db.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+            sections = dict(self._db.execute(
+                "SELECT section, COUNT(*) FROM releases GROUP BY section ORDER BY section").fetchall())
+        return {"models": models, "releases": sum(sections.values()), "sections": sections}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
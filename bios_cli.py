@@ -0,0 +1,255 @@
+"""
+Headless batch runner for scheduled use, e.g.
+
+    python bios_cli.py --workers 4 --report reports/run.json
+    python bios_cli.py --check-only --models X515JA,X415EA --report-format csv --report run.csv
+    python bios_cli.py --catalog && python bios_cli.py --from-catalog --latest 3 --download-path /srv/rollback
+
+--download-path does not move the catalog: both runs use the one of the
+configured download_path unless --catalog-path is given.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+import bios_core
+
+PHASES = ("resolve", "download", "extract", "index", "check", "catalog")
+
+
+def parse_override(text: str):
+    if "=" not in text:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {text!r}")
+    key, value = text.split("=", 1)
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key.strip(), value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download the latest ASUS BIOS for a list of models without the GUI.")
+    parser.add_argument("--config", default=bios_core.CONFIG_JSON_PATH, help="config.json to load")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        type=parse_override,
+                        help="override a config value (VALUE is parsed as JSON when possible); repeatable")
+    parser.add_argument("--model-list", help="model list file (overrides config 'model_list')")
+    parser.add_argument("--models", help="comma separated models to process instead of the model list")
+    parser.add_argument("--include", action="append", metavar="PATTERN",
+                        help="only process models of the list matching this shell-style pattern, e.g. 'X5*'; "
+                             "repeatable (overrides config 'model_include')")
+    parser.add_argument("--exclude", action="append", metavar="PATTERN",
+                        help="skip models of the list matching this pattern; repeatable "
+                             "(overrides config 'model_exclude')")
+    parser.add_argument("--download-path", help="BIOS folder (overrides config 'download_path')")
+    parser.add_argument("--workers", type=int, help="number of resolve workers / browser sessions")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check-only", action="store_true", help="only report which models have a newer BIOS")
+    mode.add_argument("--dry-run", action="store_true", help="list what would be processed without any network access")
+    mode.add_argument("--catalog", action="store_true",
+                      help="record every published BIOS of each model (version, date, size, URL) in the catalog")
+    mode.add_argument("--from-catalog", action="store_true",
+                      help="download BIOS versions picked from the catalog (see --latest, --newer-than, --since) "
+                           "without visiting the support pages")
+    parser.add_argument("--catalog-path",
+                        help="SQLite catalog for --catalog and --from-catalog (overrides config 'catalog_path')")
+    parser.add_argument("--latest", type=int, metavar="N",
+                        help="with --from-catalog: the N newest versions of each model")
+    parser.add_argument("--newer-than", type=int, metavar="VERSION",
+                        help="with --from-catalog: only versions above VERSION")
+    parser.add_argument("--since", metavar="YYYY/MM/DD",
+                        help="with --from-catalog: only versions released on or after this date")
+    parser.add_argument("--force-check", action="store_true",
+                        help="ignore the remote version cache TTL (and the catalog's with --catalog)")
+    parser.add_argument("--report", help="write a run report to this path")
+    parser.add_argument("--report-format", choices=("json", "csv"),
+                        help="report format (default: from the --report extension, else json)")
+    parser.add_argument("--metrics-jsonl", help="append one JSON line of phase timings per model to this file")
+    parser.add_argument("--metrics-prom", help="write Prometheus text metrics for the run to this file")
+    parser.add_argument("--profile-model", help="run every stage of this model under cProfile")
+    return parser.parse_args(argv)
+
+
+def build_config(args):
+    cfg = bios_core.load_config(args.config)
+    for key, value in args.overrides:
+        cfg[key] = value
+    if args.model_list:
+        cfg["model_list"] = args.model_list
+    if args.include:
+        cfg["model_include"] = args.include
+    if args.exclude:
+        cfg["model_exclude"] = args.exclude
+    if args.catalog_path:
+        cfg["catalog_path"] = args.catalog_path
+    elif (args.catalog or args.from_catalog) and args.download_path and cfg.get("download_path"):
+        # The catalog stays in the configured folder when the BIOS files go elsewhere
+        from bios_catalog import CATALOG_FILENAME
+        cfg.setdefault("catalog_path", os.path.join(cfg["download_path"], CATALOG_FILENAME))
+    if args.download_path:
+        cfg["download_path"] = args.download_path
+    if args.workers:
+        cfg["workers"] = args.workers
+        cfg.setdefault("stage_workers", {})["resolve"] = args.workers
+    if args.metrics_jsonl:
+        cfg["metrics_jsonl"] = args.metrics_jsonl
+    if args.metrics_prom:
+        cfg["metrics_prom"] = args.metrics_prom
+    if args.profile_model:
+        cfg["profile_model"] = args.profile_model
+    return cfg
+
+
+def select_models(args):
+    if args.models:
+        models = []
+        for model in args.models.split(","):
+            model = model.strip()
+            if model and model not in models:
+                models.append(model)
+        return models
+    return bios_core.retrieve_model_list(bios_core.MODEL_LIST_PATH)
+
+
+def select_releases(args, models, download_path):
+    try:
+        catalog = bios_core.open_catalog(download_path, create=False)
+    except FileNotFoundError as e:
+        logging.error(f"{e}, run with --catalog first or pass --catalog-path")
+        return []
+    try:
+        releases = catalog.releases(models, latest=args.latest, newer_than=args.newer_than, since=args.since)
+    finally:
+        catalog.close()
+    logging.info(f"Selected {len(releases)} catalogued BIOS versions of {len({r.model for r in releases})} models")
+    return releases
+
+
+def plan_models(models, download_path):
+    """Dry run: report the installed version of every model, no network access."""
+    for model in models:
+        job = bios_core.ModelJob(model=model, status="planned")
+        job.old_version = bios_core.get_bios_version_for_model(model, download_path)
+        yield job
+
+
+def job_record(job):
+    return {
+        "model": job.model,
+        "status": job.status,
+        "old_version": job.old_version,
+        "new_version": job.new_version if job.new_version is not None else (
+            job.release.version if job.release is not None else None),
+        "bytes_downloaded": job.bytes_downloaded,
+        "timings": {phase: round(seconds, 3) for phase, seconds in job.timings.items()},
+        "error": job.error,
+    }
+
+
+def write_report(path: str, fmt: str, report: dict):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    if fmt == "csv":
+        fields = ["model", "status", "old_version", "new_version", "bytes_downloaded"]
+        fields += [f"{phase}_seconds" for phase in PHASES] + ["error"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for record in report["models"]:
+                row = {key: record[key] for key in fields if key in record}
+                for phase in PHASES:
+                    row[f"{phase}_seconds"] = record["timings"].get(phase, "")
+                writer.writerow(row)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    logging.info(f"Report written to {path}")
+
+
+def run(args):
+    bios_core.configure(build_config(args))
+    download_path = bios_core.DOWNLOAD_PATH
+    models = select_models(args)
+    if args.dry_run:
+        mode = "dry-run"
+    elif args.check_only:
+        mode = "check-only"
+    elif args.catalog:
+        mode = "catalog"
+    elif args.from_catalog:
+        mode = "from-catalog"
+    else:
+        mode = "download"
+    logging.info(f"{mode}: {len(models)} models, download path {download_path}")
+
+    results = bios_core.RunResults()
+    started = time.time()
+    if args.dry_run:
+        for job in plan_models(models, download_path):
+            results.record(job)
+    elif args.check_only:
+        for _ in bios_core.check_models(models, download_path, results=results, force=args.force_check):
+            pass
+    elif args.catalog:
+        # The browser only starts for models whose page cannot be read over HTTP
+        with bios_core.create_driver_pool() as pool:
+            for _ in bios_core.catalog_models(models, download_path, pool, results=results, force=args.force_check):
+                pass
+    elif args.from_catalog:
+        releases = select_releases(args, models, download_path)
+        if not releases:
+            logging.warning("The catalog has no BIOS versions matching the selection")
+        for _ in bios_core.download_releases(releases, download_path, results=results):
+            pass
+    else:
+        with bios_core.create_driver_pool() as pool:
+            for _ in bios_core.run_models(models, download_path, pool, results=results,
+                                         journal=bios_core.open_journal(download_path)):
+                pass
+    finished = time.time()
+    phases = bios_core.log_run_metrics(results, finished - started)
+
+    records = [job_record(job) for job in results.jobs]
+    statuses = {}
+    for record in records:
+        statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+    report = {
+        "mode": mode,
+        "started_at": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+        "finished_at": datetime.fromtimestamp(finished).isoformat(timespec="seconds"),
+        "duration_seconds": round(finished - started, 3),
+        "download_path": download_path,
+        "summary": {
+            "models": len(records),
+            "statuses": statuses,
+            "bytes_downloaded": sum(record["bytes_downloaded"] for record in records),
+            "phases": phases,
+        },
+        "models": records,
+    }
+    logging.info(f"Completed in {report['duration_seconds']}s: {statuses}")
+    if args.report:
+        fmt = args.report_format or ("csv" if args.report.lower().endswith(".csv") else "json")
+        write_report(args.report, fmt, report)
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    # Up-to-date models are not errors; only real failures make the exit code non-zero
+    if report["summary"]["statuses"].get("failed"):
+        return 1
+    # ...or a catalog selection that matched nothing, e.g. a missing or empty catalog
+    return 1 if report["mode"] == "from-catalog" and not report["models"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,867 @@
+import time
+import os
+import logging
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+from driver_pool import DriverPool
+from http_resolver import BiosRelease, BiosResolver, Lookup, ResolveError, in_section
+from pipeline import Pipeline, Stage
+from rate_limit import RateLimiter
+from remote_cache import get_remote_cache
+from run_metrics import JsonLinesWriter, add_timing, format_summary, phase_summary, profiled, span, write_prometheus
+from bios_page import row_release, wait_for_bios_rows
+from archive_cache import CACHE_DIRNAME, get_archive_cache
+from job_journal import JOURNAL_FILENAME, JobJournal
+from log_pipeline import LOG_FORMAT, BufferedRotatingFileHandler, start_queue_logging
+from model_list import iter_model_entries
+from download_watch import snapshot, wait_for_download
+from bios_extract import ExtractionError, extract_bios_archive
+from version_index import flush_version_indexes, get_version_index
+
+# Load configuration
+CONFIG_JSON_PATH = 'config.json'
+
+def load_config(path=CONFIG_JSON_PATH):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+def apply_config(new_config):
+    """
+    (Re)derive the module settings below from a config dict, so callers such
+    as the CLI can override values after import.
+    """
+    global config, CHROMEDRIVER_PATH, MODEL_LIST_PATH, LOGS_PATH, DOWNLOAD_PATH, WORKERS, DRIVER_MAX_USES
+    global RESOLVER_MODE, ASUS_BASE_URL, DOWNLOAD_TIMEOUT, PAGE_TIMEOUT, STAGE_WORKERS, PIPELINE_QUEUE_SIZE, REMOTE_CACHE_TTL
+    global METRICS_JSONL_PATH, METRICS_PROM_PATH, PROFILE_MODEL, PROFILE_DIR
+    global RESUME_RUNS, RESUME_MAX_AGE, MAX_ATTEMPTS, RETRY_BACKOFF, ARCHIVE_CACHE_MB, ARCHIVE_CACHE_DIR, DEDUPE_IMAGES
+    global RATE_LIMITS, REQUEST_RETRIES, CATALOG_PATH, MODEL_INCLUDE, MODEL_EXCLUDE, LOG_MAX_BYTES, LOG_BACKUPS, LOG_SCROLLBACK
+    global _default_resolver, _rate_limiter
+    config = new_config
+    CHROMEDRIVER_PATH = config.get('chromedriver', ".\\chromedriver\\chromedriver.exe")
+    MODEL_LIST_PATH = config.get('model_list', ".\\model_list.txt")
+    # Shell-style patterns a model of the list must match / must not match, e.g. ["X5*"]
+    MODEL_INCLUDE = config.get('model_include', [])
+    MODEL_EXCLUDE = config.get('model_exclude', [])
+    LOGS_PATH = config.get('logs', ".\\logs")
+    # Log files roll over at log_max_mb into log_backups numbered copies
+    LOG_MAX_BYTES = int(config.get('log_max_mb', 10) * 1024 * 1024)
+    LOG_BACKUPS = config.get('log_backups', 3)
+    # Lines kept in the activity pane of the GUI
+    LOG_SCROLLBACK = config.get('log_scrollback_lines', 5000)
+    DOWNLOAD_PATH = config.get('download_path', "E:\\BIOS")
+    WORKERS = config.get('workers', 1)
+    DRIVER_MAX_USES = config.get('driver_max_uses', 50)
+    # "auto" tries plain HTTP first and falls back to Selenium, "http" and "selenium" force one path
+    RESOLVER_MODE = config.get('resolver', "auto")
+    ASUS_BASE_URL = config.get('asus_base_url', "https://www.asus.com")
+    DOWNLOAD_TIMEOUT = config.get('download_timeout', 60)
+    # Seconds to wait for the BIOS list of a support page to render
+    PAGE_TIMEOUT = config.get('page_timeout', 20)
+    # Worker count of each pipeline stage; resolve workers each hold one browser session
+    STAGE_WORKERS = {'resolve': WORKERS, 'download': 2, 'extract': 1, 'index': 1}
+    STAGE_WORKERS.update(config.get('stage_workers', {}))
+    PIPELINE_QUEUE_SIZE = config.get('pipeline_queue_size', 4)
+    # Published versions checked more recently than this are not looked up again
+    REMOTE_CACHE_TTL = config.get('remote_cache_ttl_hours', 12) * 3600
+    # Optional metrics outputs: one JSON line per model, and a Prometheus textfile per run
+    METRICS_JSONL_PATH = config.get('metrics_jsonl')
+    METRICS_PROM_PATH = config.get('metrics_prom')
+    # Run every stage of this one model under cProfile, dumping .prof files into PROFILE_DIR
+    PROFILE_MODEL = config.get('profile_model')
+    PROFILE_DIR = config.get('profile_dir', os.path.join(LOGS_PATH, "profiles"))
+    # Journal runs in download_path so an interrupted run resumes; failed models are
+    # retried up to MAX_ATTEMPTS times, RETRY_BACKOFF * 2^n seconds apart
+    RESUME_RUNS = config.get('resume', True)
+    # Journals of runs started longer ago than this are ignored (0: resume runs of any age)
+    RESUME_MAX_AGE = config.get('resume_max_age_hours', 24) * 3600 or None
+    MAX_ATTEMPTS = max(1, int(config.get('max_attempts', 3)))
+    RETRY_BACKOFF = config.get('retry_backoff_seconds', 30)
+    # Downloaded archives are kept, content-addressed, up to this many MB (0 disables);
+    # ARCHIVE_CACHE_DIR defaults to download_path/.archive_cache
+    ARCHIVE_CACHE_MB = config.get('archive_cache_mb', 2048)
+    ARCHIVE_CACHE_DIR = config.get('archive_cache_dir')
+    # Hard link extracted images identical to one already in the folder
+    DEDUPE_IMAGES = config.get('dedupe_images', True)
+    # Per-host token bucket and AIMD concurrency settings (see rate_limit.DEFAULT_LIMITS)
+    RATE_LIMITS = config.get('rate_limits', {"www.asus.com": {"rate": 4, "burst": 8, "max_concurrency": 4}})
+    REQUEST_RETRIES = config.get('request_retries', 2)
+    # SQLite catalog of every published BIOS (default: download_path/.bios_catalog.sqlite3)
+    CATALOG_PATH = config.get('catalog_path')
+    _default_resolver = None
+    _rate_limiter = None
+
+_default_resolver = None
+_rate_limiter = None
+# Built-in defaults until configure() applies config.json; importing reads no file
+apply_config({})
+_configured = False
+_log_listener = None
+
+def log_file_handler(path: str, fmt: str = LOG_FORMAT, datefmt=None):
+    handler = BufferedRotatingFileHandler(path, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUPS)
+    handler.setFormatter(logging.Formatter(fmt, datefmt))
+    return handler
+
+def setup_logging():
+    """
+    Send log records through a queue to LOGS_PATH/bios.log (the folder is
+    created when missing) and the console, written by one background thread.
+    Only the first call per process does anything.
+    """
+    global _log_listener
+    if _log_listener is None:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _log_listener = start_queue_logging([log_file_handler(os.path.join(LOGS_PATH, "bios.log")), console_handler])
+    return _log_listener
+
+def configure(new_config=None):
+    """
+    Apply new_config (default: config.json) and start logging. Entry points
+    call this once before running anything.
+    """
+    global _configured
+    apply_config(load_config() if new_config is None else new_config)
+    setup_logging()
+    _configured = True
+
+def ensure_configured():
+    if not _configured:
+        configure()
+
+
+def unzip_file(zip_file_path, extract_to_path):
+    """
+    Stream the BIOS images out of the zip with CRC/size verification and
+    atomic renames. Returns the extracted paths.
+    """
+    return extract_bios_archive(zip_file_path, extract_to_path)
+
+def retrieve_model_list(file_path: str, include=None, exclude=None):
+    """
+    Models of a model list file in file order, each once, filtered by the
+    include/exclude patterns (default: config 'model_include'/'model_exclude').
+    """
+    if not os.path.exists(file_path):
+        logging.error(f"File not found: {file_path}")
+        return []
+    include = MODEL_INCLUDE if include is None else include
+    exclude = MODEL_EXCLUDE if exclude is None else exclude
+    models = [entry.model for entry in iter_model_entries(file_path, include, exclude)]
+    logging.info(f"Retrieved {len(models)} unique models from the file.")
+    return models
+
+@dataclass
+class ModelJob:
+    model: str
+    status: str = "pending"
+    old_version: Optional[int] = None
+    new_version: Optional[int] = None
+    error: Optional[str] = None
+    release: Optional[BiosRelease] = None
+    archive_path: Optional[str] = None
+    bytes_downloaded: int = 0
+    extracted: list = field(default_factory=list)
+    # Seconds spent in each stage/phase
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def succeeded(self):
+        return self.status in ("success", "up_to_date", "update_available")
+
+    def fail(self, error):
+        self.status = "failed"
+        self.error = str(error)
+
+    def mark_unchanged(self):
+        # Counted as failed like before, but distinguishable from real errors
+        self.status = "unchanged"
+        self.error = "No new BIOS downloaded"
+
+class RunResults:
+    """
+    Thread-safe aggregation of per-model results for one run.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = []
+        self.success = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    @property
+    def processed(self):
+        return self.success + self.failed
+
+    def record(self, job: ModelJob):
+        with self._lock:
+            self.jobs.append(job)
+            if job.succeeded:
+                self.success += 1
+            elif job.status == "cancelled":
+                self.cancelled += 1
+            else:
+                self.failed += 1
+
+_default_resolver_lock = threading.Lock()
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Shared per-host limiter that every page load, lookup and download goes through."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(RATE_LIMITS)
+        return _rate_limiter
+
+def get_resolver():
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = BiosResolver(base_url=ASUS_BASE_URL, limiter=get_rate_limiter(),
+                                             retries=REQUEST_RETRIES)
+        return _default_resolver
+
+def support_page_url(model: str):
+    return f"{ASUS_BASE_URL}/supportonly/{model.lower()}/helpdesk_bios/"
+
+def read_page_releases(job: ModelJob, driver, cancel_event=None):
+    """
+    Open the support page of job.model and return a (release, row) pair for
+    every entry of its EZ Flash BIOS list, read with one script call.
+    """
+    website_url = support_page_url(job.model)
+    logging.info(f"Navigating to: {website_url}")
+    with span(job, "page_load"), get_rate_limiter().for_url(website_url).slot(cancel_event) as outcome:
+        driver.get(website_url)
+        outcome.responded()
+
+    # One script round trip per poll instead of a .text/XPath call per div
+    with span(job, "dom_scan"):
+        rows = wait_for_bios_rows(driver, timeout=PAGE_TIMEOUT)
+    releases = [(row_release(job.model, row), row) for row in rows]
+    return [(release, row) for release, row in releases if release is not None]
+
+def resolve_with_browser(job: ModelJob, pool, staging_path: str, cancel_event=None, cache=None):
+    """
+    Selenium fallback: find the latest version on the support page and, when it
+    is newer and not in cache, download it by clicking the button, since the
+    browser download is tied to the page. Sets job.release and job.archive_path.
+    """
+    model = job.model
+    current_version = job.old_version or 0
+    acquire_started = time.perf_counter()
+    with pool.session(staging_path) as driver:
+        add_timing(job, "browser_acquire", time.perf_counter() - acquire_started)
+        releases = read_page_releases(job, driver, cancel_event)
+        if not releases:
+            return
+        release, row = max(releases, key=lambda pair: pair[0].version)
+        job.release = release
+        if release.version <= current_version:
+            logging.info(f"No new BIOS version available. Current version: {current_version}, Latest version: {release.version}")
+            return
+        if row.get("button") is None or (cache is not None and cache.has(release)):
+            # The download stage takes it from the archive cache or fetches release.download_url
+            return
+        try:
+            logging.info(f"Downloading BIOS of Model: {model} with version {release.version}...")
+            existing = snapshot(staging_path)
+            limiter = get_rate_limiter().for_url(release.download_url or support_page_url(model))
+            with limiter.slot(cancel_event) as outcome:
+                started = time.monotonic()
+                row["button"].click()
+                outcome.responded()
+
+                # Returns as soon as Chrome renames the finished zip into place
+                with span(job, "download_wait"):
+                    result = wait_for_download(staging_path, timeout=DOWNLOAD_TIMEOUT,
+                                               existing=existing, started=started,
+                                               cancel_event=cancel_event)
+            logging.info(f"Downloaded {result.describe()}")
+            job.archive_path = result.path
+            job.bytes_downloaded = result.size
+        except Exception as e:
+            logging.error(f"Failed to download BIOS for {model}: {e}")
+            raise
+
+def resolve_model(job: ModelJob, download_path: str, pool, staging_path: str, resolver=None, cancel_event=None,
+                  cache=None):
+    """
+    Stage 1: find the latest release, over HTTP first and through the browser
+    when that fails. Returns True when there is a newer BIOS to fetch.
+    """
+    os.makedirs(download_path, exist_ok=True)
+    with span(job, "version_lookup"):
+        job.old_version = get_bios_version_for_model(job.model, download_path)
+    current_version = job.old_version or 0
+
+    if RESOLVER_MODE != "selenium":
+        if resolver is None:
+            resolver = get_resolver()
+        try:
+            with span(job, "http_resolve"):
+                job.release, source = get_remote_cache(download_path).check(job.model, resolver, REMOTE_CACHE_TTL,
+                                                                            cancel_event=cancel_event)
+            if source != "fetched" and job.release.version <= current_version:
+                logging.info(f"Published BIOS of {job.model} unchanged since last check ({source})")
+        except ResolveError as e:
+            if RESOLVER_MODE == "http":
+                raise
+            logging.info(f"{e}. Falling back to the browser.")
+    if job.release is None:
+        if pool is None:
+            raise ResolveError(f"Could not resolve BIOS for {job.model} without a browser")
+        resolve_with_browser(job, pool, staging_path, cancel_event, cache=cache)
+
+    if job.release is None:
+        job.fail("No BIOS release found on the support page")
+        return False
+    if job.release.version <= current_version:
+        if job.archive_path is None:
+            logging.info(f"No new BIOS version available. Current version: {current_version}, Latest version: {job.release.version}")
+        job.mark_unchanged()
+        return False
+    logging.info(f"New BIOS version available: {job.release.version}")
+    return True
+
+def fetch_model(job: ModelJob, staging_path: str, resolver=None, cancel_event=None, cache=None):
+    """
+    Stage 2: take the release archive from cache, or stream it over HTTP unless
+    the browser already downloaded it while resolving. New downloads are moved
+    into cache.
+    """
+    if job.archive_path is None and cache is not None:
+        cached = cache.lookup(job.release)
+        if cached is not None:
+            logging.info(f"Using cached archive of {job.model} {job.release.version}: {cached}")
+            job.archive_path = cached
+            return True
+    if job.archive_path is None:
+        if resolver is None:
+            resolver = get_resolver()
+        logging.info(f"Downloading BIOS of Model: {job.model} with version {job.release.version}...")
+        result = resolver.download(job.release, staging_path, cancel_event=cancel_event)
+        logging.info(f"Downloaded {result.describe()}")
+        job.archive_path = result.path
+        job.bytes_downloaded = result.size
+    if cache is not None and not cache.owns(job.archive_path):
+        job.archive_path = cache.store(job.archive_path, job.release)
+    return True
+
+def extract_model(job: ModelJob, download_path: str, cache=None):
+    """
+    Stage 3: extract and verify the BIOS images, then drop the archive unless
+    it is kept in cache.
+    """
+    logging.info(f"unzip file: {job.archive_path}")
+    cached = cache is not None and cache.owns(job.archive_path)
+    try:
+        # The index stage records the images; until then lookups need not rescan the folder
+        with get_version_index(download_path).writing() as written:
+            job.extracted = unzip_file(job.archive_path, download_path)
+            written.extend(job.extracted)
+    except ExtractionError:
+        if cached:
+            cache.discard(job.archive_path)
+        raise
+    finally:
+        if cached:
+            cache.unpin(job.archive_path)
+    logging.info("BIOS downloaded and unzipped successfully.")
+    if not cached and os.path.exists(job.archive_path):
+        os.remove(job.archive_path)
+        logging.info(f"Removed original zip file: {job.archive_path}")
+    return True
+
+def index_model(job: ModelJob, download_path: str):
+    """Stage 4: record the new images in the version index and settle the job status."""
+    get_version_index(download_path).add_files(job.extracted, link_duplicates=DEDUPE_IMAGES)
+    job.new_version = get_bios_version_for_model(job.model, download_path)
+    if job.new_version is not None and (job.old_version is None or job.new_version > job.old_version):
+        job.status = "success"
+    else:
+        job.fail("No new BIOS downloaded")
+    return True
+
+def download_asus_bios(model: str, bios_download_path: str, pool=None, staging_path=None, resolver=None):
+    """
+    Download and extract the latest BIOS of model into bios_download_path when it
+    is newer than the installed one, running every stage in the calling thread.
+    The zip is downloaded into staging_path (defaults to bios_download_path).
+    Returns the downloaded version, or None.
+    """
+    if staging_path is None:
+        staging_path = bios_download_path
+    own_pool = pool is None and RESOLVER_MODE != "http"
+    if own_pool:
+        pool = DriverPool(CHROMEDRIVER_PATH, size=1, max_uses=DRIVER_MAX_USES)
+    job = ModelJob(model=model)
+    cache = open_archive_cache(bios_download_path)
+    try:
+        if (resolve_model(job, bios_download_path, pool, staging_path, resolver, cache=cache)
+                and fetch_model(job, staging_path, resolver, cache=cache)
+                and extract_model(job, bios_download_path, cache=cache)):
+            index_model(job, bios_download_path)
+    finally:
+        if own_pool:
+            pool.close()
+        if cache is not None:
+            cache.save()
+        flush_version_indexes()
+    return job.release.version if job.succeeded else None
+
+def get_bios_version_for_model(model: str, bios_folder: str):
+    """
+    Given a model and a folder, find the BIOS filename in BIOS format (XXXXXX.NNN),
+    and return the version number (NNN as int). Returns None if not found.
+    Lookups go through the folder's persistent version index instead of listing it.
+    """
+    # Only use bios_folder directly, do not join with "BIOS"
+    if not os.path.isdir(bios_folder):
+        logging.warning(f"BIOS folder not found: {bios_folder}")
+        return None
+    return get_version_index(bios_folder).version_for(model)
+
+def create_driver_pool(driver_path=None, size=None, driver_factory=None):
+    if driver_path is None:
+        driver_path = CHROMEDRIVER_PATH
+    if size is None:
+        size = STAGE_WORKERS['resolve']
+    return DriverPool(driver_path, size=size, max_uses=DRIVER_MAX_USES, driver_factory=driver_factory)
+
+def timed(phase: str, func):
+    """
+    Wrap a stage function so the seconds it takes are added to job.timings[phase].
+    The stages of PROFILE_MODEL additionally run under cProfile.
+    """
+    def wrapper(job):
+        profile = bool(PROFILE_MODEL) and job.model.upper() == str(PROFILE_MODEL).upper()
+        with profiled(profile, os.path.join(PROFILE_DIR, f"{job.model}-{phase}.prof")), span(job, phase):
+            return func(job)
+    return wrapper
+
+def log_run_metrics(results, run_seconds: float):
+    """Log the per-phase p50/p95 summary of a run and write the Prometheus textfile if configured."""
+    summary = phase_summary(results.jobs)
+    if summary:
+        logging.info(f"Phase timings over {len(results.jobs)} models in {run_seconds:.1f}s:\n{format_summary(summary)}")
+    if METRICS_PROM_PATH:
+        write_prometheus(METRICS_PROM_PATH, results.jobs, run_seconds)
+    return summary
+
+def _worker_staging_path(local, download_path: str):
+    # One staging folder per worker thread, so parallel downloads never collide
+    if not hasattr(local, "staging_path"):
+        local.staging_path = os.path.join(download_path, ".downloads", threading.current_thread().name)
+        os.makedirs(local.staging_path, exist_ok=True)
+    return local.staging_path
+
+def job_from_journal(model: str, entry):
+    """
+    ModelJob that picks up where its journal entry stopped: a resolved release,
+    a downloaded archive or extracted images are not fetched again.
+    """
+    job = ModelJob(model=model)
+    if entry is None or entry["state"] not in ("resolved", "downloading", "downloaded", "extracted") \
+            or not entry.get("release"):
+        return job
+    job.old_version = entry.get("old_version")
+    job.release = BiosRelease(**entry["release"])
+    archive_path = entry.get("archive_path")
+    if archive_path and os.path.exists(archive_path):
+        job.archive_path = archive_path
+        job.bytes_downloaded = entry.get("bytes", 0)
+    if entry["state"] == "extracted":
+        job.extracted = entry.get("extracted", [])
+    return job
+
+def open_archive_cache(download_path: str):
+    """The shared archive cache of download_path, or None when it is disabled."""
+    if ARCHIVE_CACHE_MB <= 0:
+        return None
+    return get_archive_cache(ARCHIVE_CACHE_DIR or os.path.join(download_path, CACHE_DIRNAME),
+                             int(ARCHIVE_CACHE_MB * 1024 * 1024))
+
+def open_journal(download_path: str):
+    """The persistent job journal of download_path, or None when resuming is disabled."""
+    if not RESUME_RUNS:
+        return None
+    return JobJournal(os.path.join(download_path, JOURNAL_FILENAME), max_age=RESUME_MAX_AGE)
+
+def _cancel_aware_on_error(verb: str, cancel_event, extra=None):
+    """
+    Pipeline on_error handler: jobs that fail because cancel_event was set are
+    "cancelled", the others are logged as "Failed to <verb> <model>" and failed.
+    extra(job, e) runs first for anything else a failure has to update.
+    """
+    def on_error(job, stage, e):
+        if cancel_event.is_set():
+            job.status = "cancelled"
+            job.error = "Cancelled"
+            return
+        version = f" {job.release.version}" if job.release is not None else ""
+        logging.error(f"Failed to {verb} {job.model}{version} ({stage}): {e}")
+        if extra is not None:
+            extra(job, e)
+        job.fail(e)
+    return on_error
+
+def _drain(jobs, results=None, metrics=None):
+    """
+    Yield finished jobs, marking the ones a cancelled pipeline never got to as
+    "cancelled" and recording each in results and metrics (a JsonLinesWriter).
+    """
+    for job in jobs:
+        if job.status == "pending":
+            job.status = "cancelled"
+            job.error = "Cancelled"
+        if results is not None:
+            results.record(job)
+        if metrics is not None:
+            metrics.write(job)
+        yield job
+
+def run_models(models, download_path: str, pool, workers=None, results=None, cancel_event=None, journal=None):
+    """
+    Run models through the resolve -> download -> extract -> index pipeline and
+    yield each ModelJob as it completes. Every stage has its own worker count
+    (STAGE_WORKERS) and a bounded queue, so extraction overlaps with fetching
+    the next model. workers overrides the number of resolve workers.
+    Every state change is written to journal first (see open_journal): models
+    done in an interrupted run are reported without being processed again and
+    unfinished ones resume from their last state. Failed models are retried up
+    to MAX_ATTEMPTS times with exponential backoff and yielded once.
+    Setting cancel_event (or closing the generator) stops in-flight downloads
+    and yields the remaining models with status "cancelled".
+    """
+    if cancel_event is None:
+        cancel_event = threading.Event()
+    if journal is None:
+        journal = JobJournal()
+    cache = open_archive_cache(download_path)
+    stage_workers = dict(STAGE_WORKERS)
+    if workers is not None:
+        stage_workers['resolve'] = max(1, int(workers))
+    local = threading.local()
+    on_error = _cancel_aware_on_error("process", cancel_event)
+
+    def resolve(job):
+        if job.release is not None:
+            # Resumed from the journal past this stage
+            return True
+        if not resolve_model(job, download_path, pool, _worker_staging_path(local, download_path),
+                             cancel_event=cancel_event, cache=cache):
+            return False
+        journal.record_job(job, "resolved")
+        return True
+
+    def download(job):
+        if job.extracted:
+            # Resumed after extraction; the archive may already have been removed
+            return True
+        if job.archive_path is None:
+            journal.record_job(job, "downloading")
+        fetch_model(job, _worker_staging_path(local, download_path), cancel_event=cancel_event, cache=cache)
+        journal.record_job(job, "downloaded")
+        return True
+
+    def extract(job):
+        if not job.extracted:
+            extract_model(job, download_path, cache=cache)
+            journal.record_job(job, "extracted")
+        return True
+
+    def make_pipeline():
+        return Pipeline([
+            Stage("resolve", timed("resolve", resolve), stage_workers['resolve']),
+            Stage("download", timed("download", download), stage_workers['download']),
+            Stage("extract", timed("extract", extract), stage_workers['extract']),
+            Stage("index", timed("index", lambda job: index_model(job, download_path)), stage_workers['index']),
+        ], queue_size=PIPELINE_QUEUE_SIZE, on_error=on_error, cancel_event=cancel_event)
+
+    def settle(jobs):
+        # Journal finished jobs; failed ones with attempts left wait in retries instead
+        for job in jobs:
+            if job.status == "failed":
+                attempts, delay = journal.record_failure(job, RETRY_BACKOFF)
+                if attempts < MAX_ATTEMPTS and not cancel_event.is_set():
+                    logging.warning(f"{job.model} failed (attempt {attempts}/{MAX_ATTEMPTS}), retrying in {delay:.0f}s")
+                    retries[job.model] = (time.time() + delay, job)
+                    continue
+            elif job.status not in ("pending", "cancelled"):
+                journal.record_job(job, "done")
+            yield job
+
+    journal.begin(models)
+    finished, batch, retries = [], [], {}
+    now = time.time()
+    for model in models:
+        entry = journal.get(model)
+        if entry["state"] == "done":
+            finished.append(ModelJob(model=model, status=entry["status"], old_version=entry.get("old_version"),
+                                     new_version=entry.get("new_version"), error=entry.get("error")))
+        elif entry["state"] == "failed" and entry["attempts"] >= MAX_ATTEMPTS:
+            finished.append(ModelJob(model=model, status="failed", error=entry.get("error")))
+        elif entry["state"] == "failed" and entry.get("next_retry_at", 0) > now:
+            retries[model] = (entry["next_retry_at"], ModelJob(model=model, status="failed", error=entry.get("error")))
+        else:
+            batch.append(job_from_journal(model, entry))
+    if finished or retries:
+        logging.info(f"Resuming run: {len(finished)} models already finished, {len(batch)} to process, "
+                     f"{len(retries)} waiting for a retry")
+
+    metrics = JsonLinesWriter(METRICS_JSONL_PATH) if METRICS_JSONL_PATH else None
+    jobs = None
+    completed = False
+    try:
+        yield from _drain(finished, results, metrics)
+        while batch or retries:
+            jobs = make_pipeline().run(iter(batch))
+            batch = []
+            yield from _drain(settle(jobs), results, metrics)
+            if not retries or cancel_event.wait(max(0.0, min(at for at, _ in retries.values()) - time.time())):
+                break
+            now = time.time()
+            for model in [m for m, (at, _) in retries.items() if at <= now]:
+                del retries[model]
+                batch.append(ModelJob(model=model))
+        # Cancelled while failed models were waiting for a retry: report their last failure
+        yield from _drain([job for _, job in retries.values()], results, metrics)
+        completed = not cancel_event.is_set()
+    finally:
+        if jobs is not None:
+            jobs.close()
+        get_remote_cache(download_path).save()
+        if cache is not None:
+            cache.save()
+        if completed and not journal.unfinished(models, MAX_ATTEMPTS):
+            journal.finish()
+        else:
+            journal.close()
+        flush_version_indexes()
+
+def check_model(job: ModelJob, download_path: str, resolver=None, force=False, cancel_event=None):
+    """
+    Compare the installed BIOS with the published one without downloading.
+    Uses the remote version cache, so models checked within the TTL cost no
+    request and the others cost one conditional request.
+    """
+    if resolver is None:
+        resolver = get_resolver()
+    job.old_version = get_bios_version_for_model(job.model, download_path)
+    job.release, source = get_remote_cache(download_path).check(job.model, resolver, REMOTE_CACHE_TTL, force=force,
+                                                                cancel_event=cancel_event)
+    job.new_version = job.release.version
+    if job.old_version is None or job.new_version > job.old_version:
+        job.status = "update_available"
+        logging.info(f"Update available for {job.model}: {job.old_version} -> {job.new_version} ({source})")
+    else:
+        job.status = "up_to_date"
+    return True
+
+def check_models(models, download_path: str, workers=None, results=None, cancel_event=None, force=False):
+    """
+    Check-only run: yield a ModelJob per model with status "update_available",
+    "up_to_date" or "failed". Works over HTTP only and never starts a browser.
+    force ignores the TTL but still sends conditional requests.
+    """
+    if cancel_event is None:
+        cancel_event = threading.Event()
+    if workers is None:
+        workers = STAGE_WORKERS['resolve']
+
+    def check(job):
+        return check_model(job, download_path, force=force, cancel_event=cancel_event)
+
+    pipeline = Pipeline([Stage("check", timed("check", check), workers)], queue_size=PIPELINE_QUEUE_SIZE,
+                        on_error=_cancel_aware_on_error("check", cancel_event), cancel_event=cancel_event)
+    metrics = JsonLinesWriter(METRICS_JSONL_PATH) if METRICS_JSONL_PATH else None
+    jobs = pipeline.run(ModelJob(model=m) for m in models)
+    try:
+        yield from _drain(jobs, results, metrics)
+    finally:
+        jobs.close()
+        get_remote_cache(download_path).save()
+
+def open_catalog(download_path: str, create: bool = True):
+    """
+    The BIOS catalog of download_path (or CATALOG_PATH). With create=False a
+    missing catalog raises FileNotFoundError instead of starting an empty one.
+    """
+    # Only catalog runs need sqlite3
+    from bios_catalog import CATALOG_FILENAME, BiosCatalog
+    path = CATALOG_PATH or os.path.join(download_path, CATALOG_FILENAME)
+    if not create and not os.path.exists(path):
+        raise FileNotFoundError(f"No BIOS catalog at {path}")
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    return BiosCatalog(path)
+
+def catalog_model(job: ModelJob, catalog, pool=None, staging_path=None, resolver=None, cancel_event=None,
+                  force=False):
+    """
+    Record every published BIOS of job.model (all sections, each with version,
+    date, size and URL) in catalog from one lookup of its support page.
+    Models catalogued within REMOTE_CACHE_TTL are skipped and the others send a
+    conditional request. Falls back to reading the EZ Flash list in the
+    browser when HTTP fails and pool is given.
+    """
+    if not force and catalog.is_fresh(job.model, REMOTE_CACHE_TTL):
+        job.status = "up_to_date"
+        return True
+    lookup = None
+    if RESOLVER_MODE != "selenium":
+        if resolver is None:
+            resolver = get_resolver()
+        state = catalog.model_state(job.model) or {}
+        try:
+            with span(job, "http_resolve"):
+                lookup = resolver.lookup(job.model, etag=state.get("etag"), last_modified=state.get("last_modified"),
+                                         section_name=None, cancel_event=cancel_event)
+        except ResolveError as e:
+            if RESOLVER_MODE == "http" or pool is None:
+                raise
+            logging.info(f"{e}. Falling back to the browser.")
+        if lookup is not None and (lookup.not_modified or
+                                   (lookup.content_hash and lookup.content_hash == state.get("content_hash"))):
+            catalog.touch(job.model)
+            job.status = "up_to_date"
+            return True
+    if lookup is None:
+        if pool is None:
+            raise ResolveError(f"Could not catalog {job.model} without a browser")
+        with pool.session(staging_path) as driver:
+            releases = [release for release, _ in read_page_releases(job, driver, cancel_event)]
+        if not releases:
+            raise ResolveError(f"No BIOS release found on the support page of {job.model}")
+        lookup = Lookup(releases=releases)
+    added = catalog.record(job.model, lookup)
+    latest = [release.version for release in lookup.releases if in_section(release.section)]
+    job.new_version = max(latest) if latest else None
+    job.status = "success"
+    logging.info(f"Catalogued {len(lookup.releases)} BIOS releases of {job.model} ({added} new)")
+    return True
+
+def catalog_models(models, download_path: str, pool=None, catalog=None, workers=None, results=None,
+                   cancel_event=None, force=False):
+    """
+    Catalog run: yield a ModelJob per model with status "success" (releases
+    recorded), "up_to_date" (unchanged since the last lookup) or "failed".
+    pool is only used when the HTTP lookup fails.
+    """
+    if cancel_event is None:
+        cancel_event = threading.Event()
+    if workers is None:
+        workers = STAGE_WORKERS['resolve']
+    own_catalog = catalog is None
+    if own_catalog:
+        catalog = open_catalog(download_path)
+    local = threading.local()
+
+    def run(job):
+        staging_path = _worker_staging_path(local, download_path) if pool is not None else None
+        return catalog_model(job, catalog, pool, staging_path, cancel_event=cancel_event, force=force)
+
+    on_error = _cancel_aware_on_error("catalog", cancel_event, lambda job, e: catalog.record_failure(job.model, e))
+    pipeline = Pipeline([Stage("catalog", timed("catalog", run), workers)],
+                        queue_size=PIPELINE_QUEUE_SIZE, on_error=on_error, cancel_event=cancel_event)
+    metrics = JsonLinesWriter(METRICS_JSONL_PATH) if METRICS_JSONL_PATH else None
+    jobs = pipeline.run(ModelJob(model=m) for m in models)
+    try:
+        yield from _drain(jobs, results, metrics)
+    finally:
+        jobs.close()
+        if own_catalog:
+            catalog.close()
+
+def download_releases(releases, download_path: str, results=None, cancel_event=None):
+    """
+    Download and extract the given BiosReleases (e.g. picked from the catalog)
+    straight from their URLs, without visiting any support page. Versions
+    whose image is already in download_path are reported "up_to_date".
+    Yields one ModelJob per release.
+    """
+    if cancel_event is None:
+        cancel_event = threading.Event()
+    os.makedirs(download_path, exist_ok=True)
+    cache = open_archive_cache(download_path)
+    index = get_version_index(download_path)
+    local = threading.local()
+
+    def check(job):
+        installed = index.versions_for(job.model)
+        job.old_version = max(installed) if installed else None
+        if job.release.version in installed:
+            job.status = "up_to_date"
+            return False
+        return True
+
+    def download(job):
+        return fetch_model(job, _worker_staging_path(local, download_path), cancel_event=cancel_event, cache=cache)
+
+    def install(job):
+        index.add_files(job.extracted, link_duplicates=DEDUPE_IMAGES)
+        if job.release.version in index.versions_for(job.model):
+            job.new_version = job.release.version
+            job.status = "success"
+        else:
+            job.fail(f"Archive has no image of version {job.release.version}")
+        return True
+
+    on_error = _cancel_aware_on_error("fetch", cancel_event)
+    pipeline = Pipeline([
+        Stage("check", check, 1),
+        Stage("download", timed("download", download), STAGE_WORKERS['download']),
+        Stage("extract", timed("extract", lambda job: extract_model(job, download_path, cache=cache)),
+              STAGE_WORKERS['extract']),
+        Stage("index", timed("index", install), STAGE_WORKERS['index']),
+    ], queue_size=PIPELINE_QUEUE_SIZE, on_error=on_error, cancel_event=cancel_event)
+    metrics = JsonLinesWriter(METRICS_JSONL_PATH) if METRICS_JSONL_PATH else None
+    jobs = pipeline.run(ModelJob(model=release.model, release=release) for release in releases)
+    try:
+        yield from _drain(jobs, results, metrics)
+    finally:
+        jobs.close()
+        if cache is not None:
+            cache.save()
+        index.flush()
+
+def execute(download_path=None, log_callback=None, workers=None, check_only=False):
+    ensure_configured()
+    if download_path is None:
+        download_path = DOWNLOAD_PATH
+    run_started = time.perf_counter()
+    models = retrieve_model_list(MODEL_LIST_PATH)
+    logging.info(f"Models to process: {', '.join(models)}")
+    results = RunResults()
+
+    if check_only:
+        for job in check_models(models, download_path, workers=workers, results=results):
+            if log_callback:
+                if job.succeeded:
+                    log_callback(f"{job.status.upper()}: {job.model} ({job.old_version} -> {job.new_version})")
+                else:
+                    log_callback(f"FAILED: {job.model} ({job.error})")
+        logging.info(f"Check completed. Updates available: "
+                     f"{sum(1 for job in results.jobs if job.status == 'update_available')}, Failed: {results.failed}")
+        log_run_metrics(results, time.perf_counter() - run_started)
+        return results.success, results.failed
+
+    with create_driver_pool(size=workers) as pool:
+        for job in run_models(models, download_path, pool, workers=workers, results=results,
+                              journal=open_journal(download_path)):
+            if log_callback:
+                if job.succeeded:
+                    log_callback(f"SUCCESS: {job.model}")
+                else:
+                    log_callback(f"FAILED: {job.model} ({job.error})")
+
+    logging.info(f"Completed. Success: {results.success}, Failed: {results.failed}")
+    log_run_metrics(results, time.perf_counter() - run_started)
+    return results.success, results.failed
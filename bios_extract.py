@@ -0,0 +1,93 @@
+import logging
+import os
+import tempfile
+import zlib
+
+from version_index import extract_bios_version_from_filename
+
+CHUNK_SIZE = 1024 * 1024
+TEMP_SUFFIX = ".extracting"
+
+
+class ExtractionError(Exception):
+    """Raised when an archive member fails its CRC or size check."""
+
+
+def select_bios_members(zip_ref):
+    """Members whose file name is a BIOS image (XXXXXX.NNN); readmes and tools are skipped."""
+    return [
+        info for info in zip_ref.infolist()
+        if not info.is_dir() and extract_bios_version_from_filename(os.path.basename(info.filename)) is not None
+    ]
+
+
+def _safe_target(dest_dir: str, member_name: str):
+    target = os.path.abspath(os.path.join(dest_dir, member_name))
+    root = os.path.abspath(dest_dir)
+    if os.path.commonpath([root, target]) != root:
+        raise ExtractionError(f"Refusing to extract outside {dest_dir}: {member_name}")
+    return target
+
+
+def extract_member(zip_ref, info, target: str):
+    """
+    Stream one member to target in CHUNK_SIZE pieces through a temporary file
+    in the same folder, verify its CRC and size, then rename it into place.
+    A crash leaves at most a hidden *.extracting file, never a partial image.
+    """
+    folder = os.path.dirname(target)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(target) + ".", suffix=TEMP_SUFFIX, dir=folder)
+    try:
+        crc = 0
+        size = 0
+        with zip_ref.open(info) as src, os.fdopen(fd, "wb") as dst:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        if size != info.file_size:
+            raise ExtractionError(f"{info.filename}: expected {info.file_size} bytes, got {size}")
+        if crc != info.CRC:
+            raise ExtractionError(f"{info.filename}: CRC mismatch")
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return target
+
+
+def extract_bios_archive(zip_file_path: str, extract_to_path: str):
+    """
+    Extract only the BIOS images of an archive, flat into extract_to_path, and
+    return their paths. Archives without a recognisable image are extracted
+    completely so nothing is lost.
+    """
+    import zipfile
+    os.makedirs(extract_to_path, exist_ok=True)
+    extracted = []
+    try:
+        with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
+            members = select_bios_members(zip_ref)
+            if members:
+                for info in members:
+                    target = _safe_target(extract_to_path, os.path.basename(info.filename))
+                    extracted.append(extract_member(zip_ref, info, target))
+                logging.info(f"Extracted {len(members)} BIOS image(s) to: {extract_to_path}")
+            else:
+                logging.warning(f"No BIOS image found in {zip_file_path}, extracting all files")
+                for info in zip_ref.infolist():
+                    if info.is_dir():
+                        continue
+                    target = _safe_target(extract_to_path, info.filename)
+                    extracted.append(extract_member(zip_ref, info, target))
+                logging.info(f"Extracted all files to: {extract_to_path}")
+    except (zipfile.BadZipFile, zlib.error) as e:
+        raise ExtractionError(f"Corrupt archive {zip_file_path}: {e}")
+    return extracted
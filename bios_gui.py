@@ -1,203 +1,74 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 import time
-import zipfile
 import os
+import importlib
 import logging
-import json
 import tkinter as tk
-from tkinter import filedialog, messagebox, simpledialog, scrolledtext, ttk
-import re
+from tkinter import filedialog, messagebox, simpledialog, ttk
 import queue
+import threading
 from datetime import datetime
-
-# Load configuration
-CONFIG_JSON_PATH = 'config.json'
-if os.path.exists(CONFIG_JSON_PATH):
-    with open(CONFIG_JSON_PATH, 'r') as f:
-        config = json.load(f)
-else:
-    config = {}
-
-CHROMEDRIVER_PATH = config.get('chromedriver', ".\\chromedriver\\chromedriver.exe")
-MODEL_LIST_PATH = config.get('model_list', ".\\model_list.txt")
-LOGS_PATH = config.get('logs', ".\\logs")
-DOWNLOAD_PATH = config.get('download_path', "E:\\BIOS")
-
-# Configure logging
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(os.path.join(LOGS_PATH, "bios.log")),
-        logging.StreamHandler()
-    ]
-)
-
-
-def unzip_file(zip_file_path, extract_to_path):
-    os.makedirs(extract_to_path, exist_ok=True)
-    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to_path)
-        logging.info(f"Extracted all files to: {extract_to_path}")
-
-def retrieve_model_list(file_path: str):
-    if not os.path.exists(file_path):
-        logging.error(f"File not found: {file_path}")
-        return []
-    models = set()
-    with open(file_path, 'r') as file:
-        for line in file:
-            parts = line.strip().split()
-            if len(parts) > 1:
-                models.add(parts[1])
-    unique_models = list(models)
-    logging.info(f"Retrieved {len(unique_models)} unique models from the file.")
-    return unique_models
-
-# Global variable for success/fail count (for debug/logging)
-GLOBAL_SUCCESS_COUNT = 0
-GLOBAL_FAIL_COUNT = 0
-
-def download_asus_bios(model: str, bios_download_path: str):
-    global GLOBAL_SUCCESS_COUNT, GLOBAL_FAIL_COUNT
-    os.makedirs(bios_download_path, exist_ok=True)
-    current_version = get_bios_version_for_model(model, bios_download_path)
-    if current_version is None:
-        current_version = 0
-
-    options = webdriver.ChromeOptions()
-    chrome_driver_path = CHROMEDRIVER_PATH
-    prefs = {"download.default_directory": bios_download_path}
-    options.add_experimental_option("prefs", prefs)
-    driver = webdriver.Chrome(executable_path=chrome_driver_path, options=options)
-
-    website_url = f"https://www.asus.com/supportonly/{model.lower()}/helpdesk_bios/"
-    logging.info(f"Navigating to: {website_url}")
-    driver.get(website_url)
-    driver.maximize_window()
-
-    try:
-        div_elements = driver.find_elements(By.CSS_SELECTOR, "div[class*='ProductSupportDriverBIOS__contentLeft'] div")
-        print( d.text for d in div_elements) #test output
-        for div in div_elements:
-            if "BIOS for ASUS EZ Flash Utility" in div.text:
-                logging.info("Locating the wording")
-                next_div = div.find_elements(By.XPATH, "following-sibling::div/div")
-                for div2_ in next_div:
-                    if "Version" in div2_.text:
-                        version = div2_.text.replace("Version", "").strip()
-                        if int(version) > current_version:
-                            logging.info(f"New BIOS version available: {version}")
-                            try:
-                                download_link = div.find_element(
-                                    By.XPATH,
-                                    "../../div[contains(@class,'ProductSupportDriverBIOS__contentRight')]/div[contains(@class,'ProductSupportDriverBIOS__downloadBtn__')]"
-                                )
-                                logging.info(f"Downloading BIOS of Model: {model} with version {version}...")
-                                driver.execute_script("arguments[0].scrollIntoView();", download_link)
-                                download_link.click()
-
-                                # Wait for the zip file to appear (timeout: 60s)
-                                downloaded_zip = os.path.join(bios_download_path, f"{model.upper()}AS{version}.zip")
-                                max_wait = 60
-                                waited = 0
-                                while not os.path.exists(downloaded_zip) and waited < max_wait:
-                                    time.sleep(1)
-                                    waited += 1
-                                if not os.path.exists(downloaded_zip):
-                                    raise FileNotFoundError(f"Downloaded zip not found: {downloaded_zip}")
-
-                                logging.info(f"unzip file: {downloaded_zip}")
-                                unzip_file(downloaded_zip, bios_download_path)
-                                logging.info("BIOS downloaded and unzipped successfully.")
-                                if os.path.exists(downloaded_zip):
-                                    os.remove(downloaded_zip)
-                                    logging.info(f"Removed original zip file: {downloaded_zip}")
-                                GLOBAL_SUCCESS_COUNT += 1
-                            except Exception as e:
-                                logging.error(f"Failed to download or unzip BIOS for {model}: {e}")
-                                GLOBAL_FAIL_COUNT += 1
-                        else:
-                            logging.info(f"No new BIOS version available. Current version: {current_version}, Latest version: {version}")
-                            GLOBAL_FAIL_COUNT += 1
-    finally:
-        driver.quit()
-        logging.info("Browser closed.")
-
-def extract_bios_version_from_filename(filename: str):
-    """
-    Check if the BIOS filename is in the format XXXXXX.NNN,
-    where NNN is the version number, and return the version as int.
-    Returns None if not matched.
-    """
-    match = re.match(r"^[A-Za-z0-9]+\.([0-9]{3})$", filename)
-    if match:
-        return int(match.group(1))
-    return None
-
-def get_bios_version_for_model(model: str, bios_folder: str):
-    """
-    Given a model and a folder, find the BIOS filename in BIOS format (XXXXXX.NNN),
-    and return the version number (NNN as int). Returns None if not found.
-    """
-    # Only use bios_folder directly, do not join with "BIOS"
-    if not os.path.isdir(bios_folder):
-        logging.warning(f"BIOS folder not found: {bios_folder}")
-        return None
-    for filename in os.listdir(bios_folder):
-        if filename.lower().startswith(model.lower()):
-            version = extract_bios_version_from_filename(filename)
-            if version is not None:
-                return version
-    return None
-
-def execute(download_path=None, log_callback=None):
-    if download_path is None:
-        download_path = DOWNLOAD_PATH
-    models = retrieve_model_list(MODEL_LIST_PATH)
-    logging.info(f"Models to process: {', '.join(models)}")
-    success_count = 0
-    fail_count = 0
-
-    for m in models:
-        logging.info(f"Processing model: {m}")
-        try:
-            before_version = get_bios_version_for_model(m, download_path)
-            download_asus_bios(model=m, bios_download_path=download_path)
-            after_version = get_bios_version_for_model(m, download_path)
-            if after_version is not None and (before_version is None or after_version > before_version):
-                success_count += 1
-                if log_callback:
-                    log_callback(f"SUCCESS: {m}")
-            else:
-                fail_count += 1
-                if log_callback:
-                    log_callback(f"FAILED: {m} (No new BIOS downloaded)")
-        except Exception as e:
-            logging.error(f"Failed to process {m}: {e}")
-            fail_count += 1
-            if log_callback:
-                log_callback(f"FAILED: {m} ({e})")
-
-    logging.info(f"Completed. Success: {success_count}, Failed: {fail_count}")
-    return success_count, fail_count
+import bios_core
+from bios_core import (RunResults, check_models, create_driver_pool, log_file_handler, log_run_metrics, open_journal,
+                       run_models)
+from log_pipeline import start_queue_logging
+from log_view import LogView
+from model_list import iter_model_entries, parse_filter_text
+from virtual_list import VirtualListView
+
+# Maximum number of engine events applied to the UI per monitor_progress tick
+PROGRESS_BATCH_SIZE = 200
+# Model list entries handed from the loader thread to the UI per event
+MODEL_LOAD_CHUNK = 5000
+
+# Engine names that lived in this module before bios_core; looked up on first use so
+# existing callers (bios_gui.execute(), ...) keep working and the values stay current
+ENGINE_EXPORTS = {
+    'execute': 'bios_core',
+    'download_asus_bios': 'bios_core',
+    'get_bios_version_for_model': 'bios_core',
+    'retrieve_model_list': 'bios_core',
+    'unzip_file': 'bios_core',
+    'extract_bios_version_from_filename': 'version_index',
+    'config': 'bios_core',
+    'CONFIG_JSON_PATH': 'bios_core',
+    'CHROMEDRIVER_PATH': 'bios_core',
+    'MODEL_LIST_PATH': 'bios_core',
+    'LOGS_PATH': 'bios_core',
+    'DOWNLOAD_PATH': 'bios_core',
+}
+
+def __getattr__(name):
+    module = ENGINE_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
 
 class TkinterLogHandler(logging.Handler):
-    def __init__(self, text_widget):
+    """Shows log records in a LogView, which inserts them in batches on the UI thread."""
+    TAGS = {'WARNING': 'warning', 'ERROR': 'error', 'CRITICAL': 'error'}
+
+    def __init__(self, log_view):
         super().__init__()
-        self.text_widget = text_widget
+        self.log_view = log_view
 
     def emit(self, record):
-        msg = self.format(record)
-        def append():
-            self.text_widget.configure(state='normal')
-            self.text_widget.insert('end', msg + '\n')
-            self.text_widget.see('end')
-            self.text_widget.configure(state='disabled')
-        self.text_widget.after(0, append)
+        try:
+            self.log_view.append(self.format(record) + '\n', self.TAGS.get(record.levelname, 'normal'))
+        except Exception:
+            self.handleError(record)
+
+_activity_logger = None
+
+def get_activity_logger():
+    """Logger for the GUI activity pane, written to bios_download_log.txt through its own queue."""
+    global _activity_logger
+    if _activity_logger is None:
+        logger = logging.getLogger("bios_gui.activity")
+        logger.propagate = False
+        start_queue_logging([log_file_handler("bios_download_log.txt", "[%(asctime)s] %(message)s", "%H:%M:%S")],
+                            logger=logger)
+        _activity_logger = logger
+    return _activity_logger
 
 class BIOSDownloaderGUI:
     def __init__(self, root):
@@ -207,10 +78,16 @@ class BIOSDownloaderGUI:
         self.root.minsize(700, 700)
 
         # Variables
-        self.config = config
+        self.config = bios_core.config
         self.model_list = []
+        self.model_entries = []
+        self.model_load_id = 0
+        self.model_loading = False
         self.is_running = False
+        self.cancel_event = None
+        self.pool = None
         self.progress_queue = queue.Queue()
+        self.activity_log = get_activity_logger()
         self.stats = {
             'processed': 0,
             'success': 0,
@@ -264,17 +141,17 @@ class BIOSDownloaderGUI:
         config_frame.columnconfigure(3, weight=1)
 
         ttk.Label(config_frame, text="ChromeDriver Path:", font=('Arial', 9, 'bold')).grid(row=0, column=0, sticky="w", padx=(0, 10), pady=5)
-        self.driver_path_var = tk.StringVar(value=CHROMEDRIVER_PATH)
+        self.driver_path_var = tk.StringVar(value=bios_core.CHROMEDRIVER_PATH)
         ttk.Entry(config_frame, textvariable=self.driver_path_var).grid(row=0, column=1, columnspan=2, sticky="ew", padx=(0, 10), pady=5)
         ttk.Button(config_frame, text="Browse", command=self.browse_driver_path).grid(row=0, column=3, sticky="w", pady=5)
 
         ttk.Label(config_frame, text="Model List File:", font=('Arial', 9, 'bold')).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=5)
-        self.model_file_var = tk.StringVar(value=MODEL_LIST_PATH)
+        self.model_file_var = tk.StringVar(value=bios_core.MODEL_LIST_PATH)
         ttk.Entry(config_frame, textvariable=self.model_file_var).grid(row=1, column=1, columnspan=2, sticky="ew", padx=(0, 10), pady=5)
         ttk.Button(config_frame, text="Browse", command=self.browse_model_file).grid(row=1, column=3, sticky="w", pady=5)
 
         ttk.Label(config_frame, text="Download Path:", font=('Arial', 9, 'bold')).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=5)
-        self.download_path_var = tk.StringVar(value=DOWNLOAD_PATH)
+        self.download_path_var = tk.StringVar(value=bios_core.DOWNLOAD_PATH)
         ttk.Entry(config_frame, textvariable=self.download_path_var).grid(row=2, column=1, columnspan=2, sticky="ew", padx=(0, 10), pady=5)
         ttk.Button(config_frame, text="Browse", command=self.browse_download_path).grid(row=2, column=3, sticky="w", pady=5)
 
@@ -286,23 +163,22 @@ class BIOSDownloaderGUI:
         header_frame.pack(fill="x", pady=(0, 10))
 
         ttk.Button(header_frame, text="Load Model List", command=self.load_model_file).pack(side="left", padx=(0, 10))
-        ttk.Button(header_frame, text="Clear All", command=self.clear_model_list).pack(side="left")
+        ttk.Button(header_frame, text="Clear All", command=self.clear_model_list).pack(side="left", padx=(0, 10))
+
+        # Comma separated patterns, "!" excludes: "X5*, B9*, !*JA"
+        ttk.Label(header_frame, text="Filter:").pack(side="left", padx=(0, 5))
+        filters = bios_core.MODEL_INCLUDE + [f"!{pattern}" for pattern in bios_core.MODEL_EXCLUDE]
+        self.model_filter_var = tk.StringVar(value=", ".join(filters))
+        filter_entry = ttk.Entry(header_frame, textvariable=self.model_filter_var, width=24)
+        filter_entry.pack(side="left")
+        filter_entry.bind("<Return>", lambda event: self.load_model_file())
 
         self.model_count_var = tk.StringVar(value="Models: 0")
         ttk.Label(header_frame, textvariable=self.model_count_var, style='Info.TLabel').pack(side="right")
 
-        list_frame = ttk.Frame(model_frame)
-        list_frame.pack(fill="both", expand=True)
-
-        self.model_listbox = tk.Listbox(list_frame, height=6, selectmode="extended", font=('Consolas', 9))
-        model_scrollbar_y = ttk.Scrollbar(list_frame, orient="vertical", command=self.model_listbox.yview)
-        model_scrollbar_x = ttk.Scrollbar(list_frame, orient="horizontal", command=self.model_listbox.xview)
-        self.model_listbox.configure(yscrollcommand=model_scrollbar_y.set, xscrollcommand=model_scrollbar_x.set)
-        self.model_listbox.grid(row=0, column=0, sticky="nsew")
-        model_scrollbar_y.grid(row=0, column=1, sticky="ns")
-        model_scrollbar_x.grid(row=1, column=0, sticky="ew")
-        list_frame.columnconfigure(0, weight=1)
-        list_frame.rowconfigure(0, weight=1)
+        # Only the visible rows are drawn, so lists of tens of thousands of models stay responsive
+        self.model_view = VirtualListView(model_frame, row_text=lambda index: self.model_entries[index].display(index + 1))
+        self.model_view.pack(fill="both", expand=True)
 
     def create_control_section(self, parent):
         control_frame = ttk.Frame(parent)
@@ -314,6 +190,9 @@ class BIOSDownloaderGUI:
         self.stop_button = ttk.Button(control_frame, text="Stop", command=self.stop_download, state="disabled")
         self.stop_button.pack(side="left", padx=(0, 15))
 
+        self.check_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Check only", variable=self.check_only_var).pack(side="left", padx=(0, 15))
+
         ttk.Button(control_frame, text="Open Download Folder", command=self.open_download_folder).pack(side="left", padx=(0, 15))
         ttk.Button(control_frame, text="Clear Logs", command=self.clear_logs).pack(side="left")
 
@@ -343,12 +222,17 @@ class BIOSDownloaderGUI:
         log_frame = ttk.LabelFrame(parent, text="Activity Logs", padding="10")
         log_frame.pack(fill="both", expand=True, pady=(0, 10))
 
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=8, wrap="word", font=('Consolas', 9))
+        self.log_text = LogView(log_frame, max_lines=bios_core.LOG_SCROLLBACK, height=8, wrap="word", font=('Consolas', 9))
         self.log_text.pack(fill="both", expand=True)
         self.log_text.tag_configure("success", foreground="green")
         self.log_text.tag_configure("error", foreground="red")
         self.log_text.tag_configure("warning", foreground="orange")
         self.log_text.tag_configure("info", foreground="blue")
+        # Engine warnings and errors (e.g. "Failed to process X (resolve): ...") show up here too
+        self.log_handler = TkinterLogHandler(self.log_text)
+        self.log_handler.setLevel(logging.WARNING)
+        self.log_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%H:%M:%S"))
+        logging.getLogger().addHandler(self.log_handler)
 
     def create_status_bar(self):
         status_frame = ttk.Frame(self.root)
@@ -381,27 +265,68 @@ class BIOSDownloaderGUI:
             self.download_path_var.set(folder)
 
     def load_initial_config(self):
-        self.driver_path_var.set(self.config.get('chromedriver', CHROMEDRIVER_PATH))
-        self.model_file_var.set(self.config.get('model_list', MODEL_LIST_PATH))
-        self.download_path_var.set(self.config.get('download_path', DOWNLOAD_PATH))
+        self.driver_path_var.set(self.config.get('chromedriver', bios_core.CHROMEDRIVER_PATH))
+        self.model_file_var.set(self.config.get('model_list', bios_core.MODEL_LIST_PATH))
+        self.download_path_var.set(self.config.get('download_path', bios_core.DOWNLOAD_PATH))
         self.log_message("Configuration loaded", "success")
 
     def load_model_file(self):
+        """Parse the model list on a background thread; rows arrive in chunks through progress_queue."""
         file_path = self.model_file_var.get()
-        self.model_list = retrieve_model_list(file_path)
+        if not os.path.exists(file_path):
+            self.log_message(f"File not found: {file_path}", "error")
+            return
+        include, exclude = parse_filter_text(self.model_filter_var.get())
+        self.model_load_id += 1
+        self.model_entries = []
+        self.model_list = []
         self.update_model_listbox()
-        self.log_message(f"Loaded {len(self.model_list)} models from {os.path.basename(file_path)}", "success")
+        self.model_loading = True
+        self.model_count_var.set("Models: loading...")
+        threading.Thread(target=self.model_loader, args=(self.model_load_id, file_path, include, exclude),
+                         name="model-list", daemon=True).start()
+
+    def model_loader(self, load_id, file_path, include, exclude):
+        post = self.progress_queue.put
+        chunk = []
+        try:
+            for entry in iter_model_entries(file_path, include, exclude):
+                chunk.append(entry)
+                if len(chunk) >= MODEL_LOAD_CHUNK:
+                    post({'type': 'models', 'load_id': load_id, 'entries': chunk})
+                    chunk = []
+            post({'type': 'models', 'load_id': load_id, 'entries': chunk, 'done': True, 'path': file_path})
+        except OSError as e:
+            post({'type': 'models', 'load_id': load_id, 'entries': chunk, 'done': True, 'path': file_path,
+                  'error': str(e)})
+
+    def add_model_entries(self, event):
+        if event['load_id'] != self.model_load_id:
+            return  # a newer load or a clear replaced this one
+        self.model_entries.extend(event['entries'])
+        self.model_list.extend(entry.model for entry in event['entries'])
+        self.update_model_listbox(event['entries'])
+        if not event.get('done'):
+            return
+        self.model_loading = False
+        if event.get('error'):
+            self.log_message(f"Failed to read {event['path']}: {event['error']}", "error")
+        else:
+            logging.info(f"Retrieved {len(self.model_list)} unique models from the file.")
+            self.log_message(f"Loaded {len(self.model_list)} models from {os.path.basename(event['path'])}", "success")
 
     def clear_model_list(self):
+        self.model_load_id += 1
+        self.model_loading = False
+        self.model_entries = []
         self.model_list = []
         self.update_model_listbox()
         self.log_message("Model list cleared", "info")
 
-    def update_model_listbox(self):
-        self.model_listbox.delete(0, "end")
-        for i, model in enumerate(self.model_list, 1):
-            self.model_listbox.insert("end", f"{i:3d}. {model}")
-        self.model_count_var.set(f"Models: {len(self.model_list)}")
+    def update_model_listbox(self, added=()):
+        width = max((len(entry.display(0)) for entry in added), default=0)
+        self.model_view.set_count(len(self.model_entries), width)
+        self.model_count_var.set(f"Models: {len(self.model_entries)}")
 
     def open_download_folder(self):
         folder = self.download_path_var.get()
@@ -412,26 +337,24 @@ class BIOSDownloaderGUI:
             messagebox.showinfo("Info", "Download folder does not exist yet.")
 
     def clear_logs(self):
-        self.log_text.delete(1.0, "end")
+        self.log_text.clear()
         self.log_message("Logs cleared", "info")
 
     def log_message(self, message, tag="normal"):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n"
-        self.log_text.insert("end", formatted_message, tag)
-        self.log_text.see("end")
+        self.log_text.append(f"[{timestamp}] {message}\n", tag)
         self.status_var.set(message)
-        try:
-            with open("bios_download_log.txt", "a", encoding="utf-8") as f:
-                f.write(formatted_message)
-        except:
-            pass
+        self.activity_log.info(message)
 
     def start_download(self):
+        if self.model_loading:
+            messagebox.showwarning("Warning", "The model list is still loading!")
+            return
         if not self.model_list:
             messagebox.showwarning("Warning", "No models loaded!")
             return
-        if not self.driver_path_var.get() or not os.path.exists(self.driver_path_var.get()):
+        needs_browser = not self.check_only_var.get() and bios_core.RESOLVER_MODE != "http"
+        if needs_browser and (not self.driver_path_var.get() or not os.path.exists(self.driver_path_var.get())):
             messagebox.showwarning("Warning", "Please specify a valid ChromeDriver path!")
             return
         if not self.download_path_var.get():
@@ -447,68 +370,121 @@ class BIOSDownloaderGUI:
         self.progress_label_var.set("Starting download process...")
         self.log_message("Starting BIOS download session", "info")
         self.log_message(f"Total models to process: {len(self.model_list)}", "info")
-        self.download_worker()
+        self.cancel_event = threading.Event()
+        # The engine runs in the background and reports through self.progress_queue
+        worker = threading.Thread(
+            target=self.download_worker,
+            args=(list(self.model_list), self.download_path_var.get(), self.driver_path_var.get(), self.cancel_event,
+                  self.check_only_var.get()),
+            name="bios-download", daemon=True
+        )
+        worker.start()
 
     def stop_download(self):
+        if not self.is_running:
+            return
         self.is_running = False
         self.log_message("Stopping download process...", "warning")
-        self.start_button.config(state="normal")
         self.stop_button.config(state="disabled")
-        self.progress_label_var.set("Stopped by user")
+        self.progress_label_var.set("Stopping...")
+        self.cancel_event.set()
+        # Quitting the browsers makes page loads that are in flight fail right away
+        if self.pool is not None:
+            self.pool.interrupt()
 
     def update_statistics(self):
         self.processed_var.set(f"Processed: {self.stats['processed']}")
         self.success_var.set(f"Success: {self.stats['success']}")
         self.failed_var.set(f"Failed: {self.stats['failed']}")
 
-    def download_worker(self):
-        total_models = len(self.model_list)
-        processed = 0
-        success = 0
-        failed = 0
-
-        for idx, model in enumerate(self.model_list):
-            if not self.is_running:
-                break
-            processed += 1
-            self.stats['processed'] = processed
-            self.progress_var.set((processed / total_models) * 100)
-            self.progress_label_var.set(f"Processing {processed}/{total_models}: {model}")
-            self.update_statistics()
-            self.log_message(f"[{processed}/{total_models}] Processing: {model}", "info")
-            try:
-                before_version = get_bios_version_for_model(model, self.download_path_var.get())
-                download_asus_bios(model=model, bios_download_path=self.download_path_var.get())
-                after_version = get_bios_version_for_model(model, self.download_path_var.get())
-                if after_version is not None and (before_version is None or after_version > before_version):
-                    success += 1
-                    self.stats['success'] = success
-                    self.log_message(f"[{processed}/{total_models}] Success: {model}", "success")
-                else:
-                    failed += 1
-                    self.stats['failed'] = failed
-                    self.log_message(f"[{processed}/{total_models}] Failed: {model} (No new BIOS downloaded)", "error")
-            except Exception as e:
-                failed += 1
-                self.stats['failed'] = failed
-                self.log_message(f"[{processed}/{total_models}] Failed: {model} ({e})", "error")
-            self.update_statistics()
-            self.root.update()
-        self.progress_var.set(100)
-        self.progress_label_var.set("Processing complete")
-        self.start_button.config(state="normal")
-        self.stop_button.config(state="disabled")
-        self.is_running = False
-        summary = (f"Processing complete!\n"
-                   f"Success: {success}\n"
-                   f"Failed: {failed}")
-        self.log_message(summary, "info")
+    def download_worker(self, models, download_path, driver_path, cancel_event, check_only=False):
+        """
+        Runs on a background thread. Never touches Tk directly; everything the
+        UI needs goes through self.progress_queue as event dicts.
+        """
+        total_models = len(models)
+        results = RunResults()
+        run_started = time.perf_counter()
+        post = self.progress_queue.put
+        post({'type': 'status', 'text': f"Processing {total_models} models with {bios_core.STAGE_WORKERS['resolve']} workers..."})
+        def report(job):
+            post({'type': 'job', 'model': job.model, 'status': job.status, 'error': job.error,
+                  'old_version': job.old_version, 'new_version': job.new_version,
+                  'processed': results.processed, 'total': total_models,
+                  'success': results.success, 'failed': results.failed})
+
+        try:
+            if check_only:
+                for job in check_models(models, download_path, results=results, cancel_event=cancel_event):
+                    if job.status != "cancelled":
+                        report(job)
+            else:
+                with create_driver_pool(driver_path) as pool:
+                    self.pool = pool
+                    for job in run_models(models, download_path, pool, results=results, cancel_event=cancel_event,
+                                          journal=open_journal(download_path)):
+                        if job.status != "cancelled":
+                            report(job)
+        except Exception as e:
+            logging.error(f"Download run failed: {e}")
+            post({'type': 'log', 'text': f"Download run failed: {e}", 'tag': 'error'})
+        finally:
+            self.pool = None
+            log_run_metrics(results, time.perf_counter() - run_started)
+            post({'type': 'done', 'success': results.success, 'failed': results.failed,
+                  'cancelled': cancel_event.is_set()})
+
+    def handle_progress_event(self, event):
+        kind = event['type']
+        if kind == 'status':
+            self.progress_label_var.set(event['text'])
+        elif kind == 'log':
+            self.log_message(event['text'], event.get('tag', 'info'))
+        elif kind == 'models':
+            self.add_model_entries(event)
+        elif kind == 'job':
+            processed, total = event['processed'], event['total']
+            self.stats = {'processed': processed, 'success': event['success'], 'failed': event['failed']}
+            self.progress_var.set((processed / total) * 100)
+            self.progress_label_var.set(f"Processed {processed}/{total}: {event['model']}")
+            if event['status'] == "success":
+                self.log_message(f"[{processed}/{total}] Success: {event['model']}", "success")
+            elif event['status'] == "update_available":
+                self.log_message(f"[{processed}/{total}] Update available: {event['model']} "
+                                 f"({event['old_version']} -> {event['new_version']})", "warning")
+            elif event['status'] == "up_to_date":
+                self.log_message(f"[{processed}/{total}] Up to date: {event['model']} ({event['old_version']})", "info")
+            else:
+                self.log_message(f"[{processed}/{total}] Failed: {event['model']} ({event['error']})", "error")
+        elif kind == 'done':
+            self.is_running = False
+            self.start_button.config(state="normal")
+            self.stop_button.config(state="disabled")
+            if event['cancelled']:
+                self.progress_label_var.set("Stopped by user")
+            else:
+                self.progress_var.set(100)
+                self.progress_label_var.set("Processing complete")
+            summary = (f"Processing {'stopped' if event['cancelled'] else 'complete'}!\n"
+                       f"Success: {event['success']}\n"
+                       f"Failed: {event['failed']}")
+            self.log_message(summary, "info")
 
     def monitor_progress(self):
-        # Placeholder for future threaded/async progress
+        # Drain queued engine events in one batch per tick, then repaint once
+        handled = 0
+        try:
+            while handled < PROGRESS_BATCH_SIZE:
+                self.handle_progress_event(self.progress_queue.get_nowait())
+                handled += 1
+        except queue.Empty:
+            pass
+        if handled:
+            self.update_statistics()
         self.root.after(100, self.monitor_progress)
 
 def main():
+    bios_core.configure()
     root = tk.Tk()
     app = BIOSDownloaderGUI(root)
     root.mainloop()
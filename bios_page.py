@@ -0,0 +1,75 @@
+import logging
+
+from http_resolver import BIOS_SECTION_NAME, BiosRelease, parse_version
+
+# Runs in the page and returns one row per EZ Flash BIOS entry, newest first as
+# listed: {title, version, date, size, url, button}. button comes back as a
+# WebElement so it can be clicked without locating it again.
+BIOS_ROWS_SCRIPT = r"""
+var section = arguments[0];
+var rows = [];
+var lefts = document.querySelectorAll("div[class*='ProductSupportDriverBIOS__contentLeft']");
+for (var i = 0; i < lefts.length; i++) {
+  var divs = lefts[i].querySelectorAll("div");
+  for (var j = 0; j < divs.length; j++) {
+    var title = divs[j];
+    var info = title.nextElementSibling;
+    if (title.textContent.indexOf(section) < 0 || !info) continue;
+    var version = null, date = "", size = "";
+    for (var k = 0; k < info.children.length; k++) {
+      var text = info.children[k].textContent.trim();
+      if (/^Version/i.test(text)) version = text.replace(/^Version/i, "").trim();
+      else if (/\d{4}\/\d{1,2}\/\d{1,2}/.test(text)) date = text;
+      else if (/\d\s*[KMG]?B(ytes)?$/i.test(text)) size = text;
+    }
+    if (version === null) continue;
+    var item = title.parentElement && title.parentElement.parentElement;
+    var button = item && item.querySelector(
+      "div[class*='ProductSupportDriverBIOS__contentRight'] div[class*='ProductSupportDriverBIOS__downloadBtn__']");
+    var link = button && (button.closest("a[href]") || button.querySelector("a[href]"));
+    rows.push({
+      title: title.textContent.trim(),
+      version: version,
+      date: date,
+      size: size,
+      url: link ? link.href : (button && button.getAttribute("data-href")) || "",
+      button: button || null
+    });
+    break;
+  }
+}
+return rows;
+"""
+
+
+def wait_for_bios_rows(driver, timeout: float = 20, poll: float = 0.2):
+    """
+    Poll BIOS_ROWS_SCRIPT until the BIOS list has rendered and return its rows,
+    one WebDriver round trip per poll. Returns [] when nothing rendered in time.
+    """
+    # selenium.webdriver pulls in most of selenium; only browser runs pay for it
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(
+            lambda d: d.execute_script(BIOS_ROWS_SCRIPT, BIOS_SECTION_NAME) or False
+        )
+    except TimeoutException:
+        logging.warning(f"No BIOS entries rendered within {timeout}s on {driver.current_url}")
+        return []
+
+
+def row_release(model: str, row):
+    """BiosRelease for a row returned by BIOS_ROWS_SCRIPT, or None if its version is unreadable."""
+    version = parse_version(row.get("version"))
+    if version is None:
+        return None
+    return BiosRelease(
+        model=model,
+        version=version,
+        title=row.get("title") or "",
+        release_date=row.get("date") or "",
+        size=row.get("size") or "",
+        download_url=row.get("url") or "",
+        section=BIOS_SECTION_NAME,
+    )
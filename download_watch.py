@@ -0,0 +1,162 @@
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from dataclasses import dataclass
+
+# Chrome, Firefox/Edge and our own HTTP downloader write to these before renaming
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp", ".partial")
+POLL_INTERVAL = 0.1
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass
+class DownloadResult:
+    path: str
+    size: int
+    elapsed: float
+
+    @property
+    def throughput(self):
+        """Bytes per second, measured from when the wait started."""
+        if self.elapsed <= 0:
+            return float(self.size)
+        return self.size / self.elapsed
+
+    def describe(self):
+        return (f"{os.path.basename(self.path)}: {self.size / 1048576:.1f} MB in "
+                f"{self.elapsed:.1f}s ({self.throughput / 1048576:.2f} MB/s)")
+
+
+def snapshot(directory: str):
+    """Names already present in directory, to be ignored by wait_for_download."""
+    try:
+        return set(os.listdir(directory))
+    except FileNotFoundError:
+        return set()
+
+
+def _is_candidate(name: str, existing, suffix):
+    if name in existing or name.startswith("."):
+        return False
+    lower = name.lower()
+    if lower.endswith(PARTIAL_SUFFIXES):
+        return False
+    return suffix is None or lower.endswith(suffix)
+
+
+def _find_finished(directory: str, existing, suffix):
+    for name in snapshot(directory):
+        if _is_candidate(name, existing, suffix):
+            return os.path.join(directory, name)
+    return None
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError, TypeError):
+        return None
+    return libc
+
+
+_libc = None
+_libc_loaded = False
+
+
+def get_inotify():
+    """libc with inotify, loaded on first use (find_library runs ldconfig), or None."""
+    global _libc, _libc_loaded
+    if not _libc_loaded:
+        _libc = _load_inotify()
+        _libc_loaded = True
+    return _libc
+
+
+def _wait_inotify(directory, existing, suffix, deadline, cancel_event):
+    fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None, False
+    try:
+        wd = _libc.inotify_add_watch(fd, os.fsencode(directory), IN_MOVED_TO | IN_CLOSE_WRITE | IN_CREATE)
+        if wd < 0:
+            return None, False
+        # The file may have landed before the watch was registered
+        found = _find_finished(directory, existing, suffix)
+        while found is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancel_event is not None and cancel_event.is_set()):
+                break
+            # Wake up periodically so cancellation is noticed
+            ready, _, _ = select.select([fd], [], [], min(remaining, 0.5))
+            if not ready:
+                continue
+            data = os.read(fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                if mask & (IN_MOVED_TO | IN_CLOSE_WRITE) and _is_candidate(name, existing, suffix):
+                    found = os.path.join(directory, name)
+                    break
+        return found, True
+    finally:
+        os.close(fd)
+
+
+def _wait_polling(directory, existing, suffix, deadline, cancel_event):
+    while True:
+        found = _find_finished(directory, existing, suffix)
+        if found is not None:
+            return found
+        if time.monotonic() >= deadline or (cancel_event is not None and cancel_event.is_set()):
+            return None
+        time.sleep(POLL_INTERVAL)
+
+
+def wait_for_download(directory: str, timeout: float = 60, existing=None, suffix=".zip",
+                      started=None, cancel_event=None):
+    """
+    Block until a new, fully written file shows up in directory and return a
+    DownloadResult for it. Partial files (.crdownload etc.) are ignored, so this
+    returns as soon as the browser renames the finished file into place.
+    Uses inotify where available and falls back to fast polling elsewhere.
+    Raises TimeoutError when nothing arrives in time.
+    """
+    if existing is None:
+        existing = set()
+    if started is None:
+        started = time.monotonic()
+    suffix = suffix.lower() if suffix else None
+    deadline = time.monotonic() + timeout
+    os.makedirs(directory, exist_ok=True)
+
+    found, watched = (None, False)
+    if get_inotify() is not None:
+        try:
+            found, watched = _wait_inotify(directory, existing, suffix, deadline, cancel_event)
+        except OSError as e:
+            logging.debug(f"inotify unavailable, polling instead: {e}")
+    if not watched:
+        found = _wait_polling(directory, existing, suffix, deadline, cancel_event)
+    if found is None:
+        if cancel_event is not None and cancel_event.is_set():
+            raise InterruptedError(f"Download into {directory} was cancelled")
+        raise TimeoutError(f"No download finished in {directory} within {timeout}s")
+    return DownloadResult(path=found, size=os.path.getsize(found), elapsed=time.monotonic() - started)
@@ -0,0 +1,190 @@
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverSession:
+    """
+    A warm Chrome instance owned by a DriverPool, plus the bookkeeping the
+    pool needs to decide when it has to be restarted.
+    """
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.download_dir = None
+
+    def set_download_dir(self, path: str):
+        """
+        Point Chrome downloads at path through DevTools instead of profile prefs,
+        so the same browser can be reused for every model.
+        """
+        path = os.path.abspath(path)
+        if path == self.download_dir:
+            return
+        os.makedirs(path, exist_ok=True)
+        self.driver.execute_cdp_cmd(
+            "Page.setDownloadBehavior",
+            {"behavior": "allow", "downloadPath": path}
+        )
+        self.download_dir = path
+
+    def is_alive(self):
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error while closing browser: {e}")
+
+
+class DriverPool:
+    """
+    Keeps up to `size` Chrome sessions alive for a whole run. A session is
+    restarted only after it crashes or after `max_uses` models.
+    driver_factory(driver_path) replaces webdriver.Chrome, e.g. with a fake
+    driver for offline benchmarks.
+    """
+    def __init__(self, driver_path: str, size: int = 1, max_uses: int = 50, driver_factory=None):
+        self.driver_path = driver_path
+        self.driver_factory = driver_factory
+        self.size = max(1, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._sessions = set()
+        self._closed = False
+
+    def _launch(self):
+        if self.driver_factory is not None:
+            driver = self.driver_factory(self.driver_path)
+        else:
+            from selenium import webdriver
+            options = webdriver.ChromeOptions()
+            driver = webdriver.Chrome(executable_path=self.driver_path, options=options)
+        driver.maximize_window()
+        logging.info("Browser started.")
+        return DriverSession(driver)
+
+    def acquire(self, download_dir: str, timeout=None):
+        """
+        Borrow a session whose downloads go to download_dir. A session that
+        crashed while idle is restarted instead of being handed out.
+        """
+        failures = 0
+        while True:
+            session = self._checkout(timeout)
+            session.uses += 1
+            try:
+                session.set_download_dir(download_dir)
+                return session
+            except WebDriverException as e:
+                failures += 1
+                logging.warning(f"Browser session failed to switch download folder: {e}")
+                self.release(session, broken=True)
+                if failures > self.size:
+                    raise
+            except Exception:
+                self.release(session)
+                raise
+
+    def _checkout(self, timeout=None):
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        waited = 0.0
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    session = self._launch()
+                    with self._lock:
+                        self._sessions.add(session)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                return session
+            # Every session is busy; poll so a crashed session freeing a slot is noticed
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                waited += 0.5
+                if timeout is not None and waited >= timeout:
+                    raise TimeoutError("No browser session became available")
+
+    def release(self, session, broken: bool = False):
+        if broken and session.is_alive():
+            broken = False
+        if self._closed or broken or session.uses >= self.max_uses:
+            if broken:
+                logging.warning("Browser session crashed, it will be restarted.")
+            session.quit()
+            logging.info("Browser closed.")
+            with self._lock:
+                self._created -= 1
+                self._sessions.discard(session)
+            return
+        self._idle.put(session)
+
+    @contextmanager
+    def session(self, download_dir: str):
+        """
+        Borrow a driver whose downloads go to download_dir for the duration
+        of the with-block.
+        """
+        session = self.acquire(download_dir)
+        broken = False
+        try:
+            yield session.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(session, broken=broken)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            session.quit()
+            with self._lock:
+                self._created -= 1
+                self._sessions.discard(session)
+        logging.info("Driver pool closed.")
+
+    def interrupt(self):
+        """
+        Quit every session, including the busy ones, so in-flight page loads and
+        clicks fail immediately. The pool cannot be used afterwards.
+        """
+        self._closed = True
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.quit()
+        logging.info("Browser sessions interrupted.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
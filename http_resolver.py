@@ -0,0 +1,373 @@
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import quote, urljoin, urlsplit
+
+from download_watch import DownloadResult
+from rate_limit import THROTTLE_STATUSES, Outcome, backoff_delay, retry_after_seconds
+
+ASUS_BASE_URL = "https://www.asus.com"
+BIOS_SECTION_NAME = "BIOS for ASUS EZ Flash Utility"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+CHUNK_SIZE = 1024 * 1024
+
+
+class ResolveError(Exception):
+    """Raised when the BIOS version or download URL cannot be resolved over HTTP."""
+
+
+@dataclass
+class BiosRelease:
+    model: str
+    version: int
+    title: str = ""
+    release_date: str = ""
+    size: str = ""
+    download_url: str = ""
+    # Name of the support page section listing the release
+    section: str = ""
+
+    @property
+    def filename(self):
+        name = os.path.basename(urlsplit(self.download_url).path)
+        if name.lower().endswith(".zip"):
+            return name
+        return f"{self.model.upper()}AS{self.version}.zip"
+
+
+@dataclass
+class Lookup:
+    releases: list
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    not_modified: bool = False
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections, one per host and per thread, so every
+    request after the first one to a host skips the TCP and TLS handshakes.
+    """
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connections(self):
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def _connection(self, scheme, netloc):
+        connections = self._connections()
+        key = (scheme, netloc)
+        conn = connections.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.timeout)
+            connections[key] = conn
+        return conn
+
+    def _drop(self, scheme, netloc):
+        conn = self._connections().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def open(self, method, url, headers=None, max_redirects=5):
+        """
+        Send a request and return the http.client response after following
+        redirects. The caller must read the body to the end (or close the
+        response) before reusing the pool on the same thread.
+        """
+        request_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity"}
+        request_headers.update(headers or {})
+        for _ in range(max_redirects + 1):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            for attempt in range(2):
+                conn = self._connection(parts.scheme, parts.netloc)
+                try:
+                    conn.request(method, path, headers=request_headers)
+                    response = conn.getresponse()
+                    break
+                except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                        ConnectionResetError, BrokenPipeError):
+                    # Stale keep-alive connection; reconnect once
+                    self._drop(parts.scheme, parts.netloc)
+                    if attempt:
+                        raise
+                except Exception:
+                    self._drop(parts.scheme, parts.netloc)
+                    raise
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader("Location")
+                response.read()
+                if not location:
+                    return response
+                url = urljoin(url, location)
+                continue
+            if response.getheader("Connection", "").lower() == "close":
+                self._connections().pop((parts.scheme, parts.netloc), None)
+            return response
+        raise ResolveError(f"Too many redirects for {url}")
+
+    def get(self, url, headers=None):
+        response = self.open("GET", url, headers=headers)
+        return response.status, response, response.read()
+
+    def close(self):
+        for conn in self._connections().values():
+            conn.close()
+        self._connections().clear()
+
+
+def parse_version(text):
+    digits = re.sub(r"[^0-9]", "", str(text))
+    if not digits:
+        return None
+    return int(digits)
+
+
+def in_section(name: str, section_name=BIOS_SECTION_NAME):
+    """
+    Whether a support page section called name is the one meant by
+    section_name: the site's names may carry extra text around it. None
+    matches every section. BiosCatalog.releases() applies the same rule in SQL.
+    """
+    return section_name is None or section_name in name
+
+
+def parse_bios_json(data, model: str, section_name=BIOS_SECTION_NAME):
+    """
+    Return every release listed in the EZ Flash BIOS section of a GetPDBIOS
+    style payload (in every section when section_name is None), newest
+    version first.
+    """
+    try:
+        sections = data["Result"]["Obj"]
+    except (KeyError, TypeError):
+        raise ResolveError(f"Unexpected BIOS payload for {model}")
+    releases = []
+    for section in sections or []:
+        name = str(section.get("Name", ""))
+        if not in_section(name, section_name):
+            continue
+        for entry in section.get("Files") or []:
+            version = parse_version(entry.get("Version", ""))
+            url = entry.get("DownloadUrl") or ""
+            if isinstance(url, dict):
+                url = url.get("Global") or next(iter(url.values()), "")
+            if version is None or not url:
+                continue
+            releases.append(BiosRelease(
+                model=model,
+                version=version,
+                title=entry.get("Title", ""),
+                release_date=entry.get("ReleaseDate", ""),
+                size=entry.get("FileSize", ""),
+                download_url=url,
+                section=name,
+            ))
+    releases.sort(key=lambda r: r.version, reverse=True)
+    return releases
+
+
+def parse_bios_html(html: str, model: str, section_name=BIOS_SECTION_NAME):
+    """
+    Find the BIOS payload embedded in the support page markup and parse it
+    like the JSON API response.
+    """
+    decoder = json.JSONDecoder()
+    # Embedded JSON may be compact or pretty-printed ("Name": "...")
+    marker = re.compile(r'"Name"\s*:\s*"[^"]*' + re.escape(section_name or ""))
+    releases = []
+    for match in marker.finditer(html):
+        brace = html.rfind("{", 0, match.start())
+        try:
+            section, _ = decoder.raw_decode(html, brace)
+            releases.extend(parse_bios_json({"Result": {"Obj": [section]}}, model, section_name))
+        except (ValueError, ResolveError):
+            pass
+    releases.sort(key=lambda r: r.version, reverse=True)
+    return releases
+
+
+class BiosResolver:
+    """
+    Resolve BIOS versions and download URLs over plain HTTP. base_url can point
+    at a local stub server that serves recorded pages.
+    Every request waits for limiter (a rate_limit.RateLimiter) when given, and
+    throttled or failed requests are retried up to `retries` times with
+    jittered exponential backoff starting at retry_base seconds.
+    """
+    def __init__(self, base_url=ASUS_BASE_URL, pool=None, timeout=30, limiter=None, retries=2, retry_base=1.0):
+        self.base_url = base_url.rstrip("/")
+        self.pool = pool or ConnectionPool(timeout=timeout)
+        self.limiter = limiter
+        self.retries = max(0, int(retries))
+        self.retry_base = retry_base
+
+    def _slot(self, url, cancel_event=None):
+        if self.limiter is None:
+            return nullcontext(Outcome())
+        return self.limiter.for_url(url).slot(cancel_event)
+
+    def _backoff(self, url, attempt, cancel_event=None):
+        delay = backoff_delay(attempt, self.retry_base)
+        logging.info(f"Retrying {url} in {delay:.1f}s")
+        if cancel_event is not None:
+            if cancel_event.wait(delay):
+                raise InterruptedError(f"Request to {url} was cancelled")
+        else:
+            time.sleep(delay)
+
+    def _get(self, url, headers=None, cancel_event=None):
+        """
+        pool.get() through the limiter, retrying throttled and failed requests.
+        Setting cancel_event interrupts the wait for a slot or a retry.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                with self._slot(url, cancel_event) as outcome:
+                    response = self.pool.open("GET", url, headers=headers)
+                    outcome.responded()
+                    body = response.read()
+                    if response.status in THROTTLE_STATUSES:
+                        outcome.throttle(retry_after_seconds(response.getheader("Retry-After")))
+                if response.status not in THROTTLE_STATUSES or attempt == self.retries:
+                    return response.status, response, body
+            except InterruptedError:
+                raise
+            except (OSError, http.client.HTTPException):
+                if attempt == self.retries:
+                    raise
+            self._backoff(url, attempt, cancel_event)
+
+    def api_url(self, model: str):
+        return f"{self.base_url}/support/api/product.asmx/GetPDBIOS?website=global&model={quote(model.lower())}"
+
+    def page_url(self, model: str):
+        return f"{self.base_url}/supportonly/{quote(model.lower())}/helpdesk_bios/"
+
+    def lookup(self, model: str, etag=None, last_modified=None, section_name=BIOS_SECTION_NAME, cancel_event=None):
+        """
+        Like resolve(), but sends If-None-Match/If-Modified-Since to the JSON API
+        and returns a Lookup with the validators and a hash of the payload.
+        Lookup.not_modified is True (and releases empty) on a 304. With
+        section_name None, the releases of every BIOS section are returned.
+        Raises InterruptedError once cancel_event is set while throttled.
+        """
+        errors = []
+        headers = {"Accept": "application/json"}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            status, response, body = self._get(self.api_url(model), headers=headers, cancel_event=cancel_event)
+            if status == 304:
+                return Lookup(releases=[], etag=etag, last_modified=last_modified, not_modified=True)
+            if status == 200:
+                releases = parse_bios_json(json.loads(body.decode("utf-8")), model, section_name)
+                if releases:
+                    return Lookup(
+                        releases=releases,
+                        etag=response.getheader("ETag"),
+                        last_modified=response.getheader("Last-Modified"),
+                        content_hash=hashlib.sha256(body).hexdigest(),
+                    )
+            errors.append(f"API returned {status}")
+        except InterruptedError:
+            raise
+        except (OSError, ValueError, http.client.HTTPException, ResolveError) as e:
+            errors.append(f"API: {e}")
+        try:
+            status, response, body = self._get(self.page_url(model), cancel_event=cancel_event)
+            if status == 200:
+                releases = parse_bios_html(body.decode("utf-8", "replace"), model, section_name)
+                if releases:
+                    return Lookup(
+                        releases=releases,
+                        etag=response.getheader("ETag"),
+                        last_modified=response.getheader("Last-Modified"),
+                        content_hash=hashlib.sha256(body).hexdigest(),
+                    )
+            errors.append(f"page returned {status}")
+        except InterruptedError:
+            raise
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(f"page: {e}")
+        raise ResolveError(f"Could not resolve BIOS for {model}: {'; '.join(errors)}")
+
+    def resolve(self, model: str, cancel_event=None):
+        """
+        Return all releases of model, newest first. Tries the JSON API and then
+        the support page; raises ResolveError when neither yields a release.
+        """
+        return self.lookup(model, cancel_event=cancel_event).releases
+
+    def latest(self, model: str, cancel_event=None):
+        return self.resolve(model, cancel_event)[0]
+
+    def download(self, release: BiosRelease, dest_dir: str, cancel_event=None):
+        """
+        Stream the release archive into dest_dir and return a DownloadResult.
+        The file only appears under its final name once it is complete.
+        """
+        started = time.monotonic()
+        os.makedirs(dest_dir, exist_ok=True)
+        url = release.download_url
+        for attempt in range(self.retries + 1):
+            try:
+                # The slot is held for the whole transfer, so downloads count against the host's concurrency
+                with self._slot(url, cancel_event) as outcome:
+                    response = self.pool.open("GET", url)
+                    outcome.responded()
+                    if response.status not in THROTTLE_STATUSES:
+                        return self._stream_to_file(response, release, dest_dir, started, cancel_event)
+                    response.read()
+                    outcome.throttle(retry_after_seconds(response.getheader("Retry-After")))
+                if attempt == self.retries:
+                    raise ResolveError(f"Download of {url} returned {response.status}")
+            except InterruptedError:
+                raise
+            except (OSError, http.client.HTTPException):
+                if attempt == self.retries:
+                    raise
+            self._backoff(url, attempt, cancel_event)
+
+    def _stream_to_file(self, response, release: BiosRelease, dest_dir: str, started: float, cancel_event=None):
+        target = os.path.join(dest_dir, release.filename)
+        partial = target + ".part"
+        if response.status != 200:
+            response.read()
+            raise ResolveError(f"Download of {release.download_url} returned {response.status}")
+        try:
+            with open(partial, "wb") as f:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise InterruptedError(f"Download of {release.download_url} was cancelled")
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            os.replace(partial, target)
+        except Exception:
+            # The connection is left mid-body and cannot be reused
+            self.pool.close()
+            raise
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        logging.info(f"Downloaded {release.download_url} to {target}")
+        return DownloadResult(path=target, size=os.path.getsize(target), elapsed=time.monotonic() - started)
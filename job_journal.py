@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+
+JOURNAL_FILENAME = ".run_journal.jsonl"
+
+# Life cycle of a model within a run; "done" and "failed" are terminal per attempt
+STATES = ("pending", "resolved", "downloading", "downloaded", "extracted", "done", "failed")
+UNFINISHED = ("pending", "resolved", "downloading", "downloaded", "extracted")
+
+
+class JobJournal:
+    """
+    Write-ahead log of the state of every model in a run, one JSON line per
+    transition, flushed and fsynced before the work it describes continues.
+    Replaying the file gives the latest state of each model, so a run that
+    crashed or was closed picks up where it stopped. A journal whose run
+    started more than max_age seconds ago is ignored, so models of a long
+    abandoned run are checked again. With path None the journal only lives
+    in memory.
+    """
+    def __init__(self, path=None, fsync: bool = True, max_age=None):
+        self.path = path
+        self.fsync = fsync
+        self.max_age = max_age
+        self.entries = {}
+        # Time the run recorded in the journal began; set by begin()
+        self.started = None
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            self._replay()
+
+    def _replay(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line of a crashed run
+                        continue
+                    if "model" in record:
+                        self._apply(record)
+                    else:
+                        self.started = record.get("started", self.started)
+        except OSError:
+            return
+        if self.entries and self.max_age is not None:
+            # Journals written before runs recorded their start count from their oldest record
+            started = self.started or min(entry.get("ts", 0) for entry in self.entries.values())
+            if time.time() - started > self.max_age:
+                logging.info(f"Ignoring run journal {self.path}: its run started "
+                             f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(started))}, starting over")
+                self.entries = {}
+                self.started = None
+        if self.entries:
+            unfinished = sum(1 for entry in self.entries.values() if entry["state"] != "done")
+            logging.info(f"Resuming run journal {self.path}: {len(self.entries)} models, {unfinished} not done")
+
+    def _apply(self, record):
+        model = record["model"]
+        entry = self.entries.get(model, {})
+        if record["state"] in ("pending", "done", "failed"):
+            # Start over from this record, keeping only the attempt count
+            entry = {"attempts": entry.get("attempts", 0)}
+        entry.update({key: value for key, value in record.items() if key != "model"})
+        self.entries[model] = entry
+
+    def get(self, model: str):
+        with self._lock:
+            return self.entries.get(model)
+
+    def begin(self, models):
+        """
+        Add the models not in the journal yet as pending and compact the file
+        to the run's start time and one line per model.
+        """
+        with self._lock:
+            if self.started is None:
+                self.started = round(time.time(), 3)
+            for model in models:
+                if model not in self.entries:
+                    self.entries[model] = {"attempts": 0, "state": "pending", "ts": time.time()}
+            if self.path is None:
+                return
+            self._close_file()
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"started": self.started}) + "\n")
+                for model, entry in self.entries.items():
+                    f.write(json.dumps(dict(entry, model=model)) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def record(self, model: str, state: str, **fields):
+        record = dict(fields, model=model, state=state, ts=round(time.time(), 3))
+        with self._lock:
+            self._apply(record)
+            if self.path is None:
+                return
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def record_job(self, job, state: str):
+        """Record a ModelJob reaching state, with what is needed to resume it from there."""
+        if state == "resolved":
+            self.record(job.model, state, old_version=job.old_version,
+                        release=asdict(job.release) if job.release is not None else None,
+                        archive_path=job.archive_path and os.path.abspath(job.archive_path),
+                        bytes=job.bytes_downloaded)
+        elif state == "downloaded":
+            self.record(job.model, state, archive_path=os.path.abspath(job.archive_path), bytes=job.bytes_downloaded)
+        elif state == "extracted":
+            self.record(job.model, state, extracted=[os.path.abspath(path) for path in job.extracted])
+        elif state == "done":
+            self.record(job.model, state, status=job.status, old_version=job.old_version,
+                        new_version=job.new_version, error=job.error)
+        else:
+            self.record(job.model, state)
+
+    def record_failure(self, job, backoff: float):
+        """
+        Record a failed attempt and schedule the next one backoff * 2^(attempts-1)
+        seconds from now. Returns (attempts, delay).
+        """
+        entry = self.get(job.model) or {}
+        attempts = entry.get("attempts", 0) + 1
+        delay = backoff * 2 ** (attempts - 1)
+        self.record(job.model, "failed", attempts=attempts, error=job.error, next_retry_at=time.time() + delay)
+        return attempts, delay
+
+    def unfinished(self, models, max_attempts: int):
+        """Models that are neither done nor failed for good."""
+        with self._lock:
+            return [
+                model for model in models
+                if model in self.entries and (
+                    self.entries[model]["state"] in UNFINISHED or
+                    (self.entries[model]["state"] == "failed" and self.entries[model]["attempts"] < max_attempts))
+            ]
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+    def finish(self):
+        """
+        Close a completed run: keep its journal as <journal>.last, so the next
+        run starts from scratch.
+        """
+        self.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.replace(self.path, self.path + ".last")
+            logging.info(f"Run complete, journal kept as {self.path}.last")
@@ -0,0 +1,90 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that writes through a large buffer instead of flushing
+    and seeking after every record. The buffer is flushed on ERROR records,
+    by flush() (see LogListener) and on close; the file size is tracked in
+    memory for the rollover check.
+    """
+    def __init__(self, filename, max_bytes: int = 0, backup_count: int = 0, encoding: str = "utf-8",
+                 buffer_size: int = 64 * 1024):
+        self.buffer_size = buffer_size
+        self.size = 0
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+
+    def _open(self):
+        folder = os.path.dirname(self.baseFilename)
+        os.makedirs(folder, exist_ok=True)
+        # FileHandler.errors only exists from Python 3.9
+        stream = open(self.baseFilename, self.mode, encoding=self.encoding, errors=getattr(self, "errors", None),
+                      buffering=self.buffer_size)
+        self.size = os.path.getsize(self.baseFilename)
+        return stream
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.size + len(msg) >= self.maxBytes and self.size > 0:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self.size += len(msg)
+            if record.levelno >= logging.ERROR:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class LogListener(logging.handlers.QueueListener):
+    """
+    QueueListener that flushes its handlers whenever no record arrived for
+    flush_interval seconds, so buffered files catch up once a burst is over.
+    """
+    def __init__(self, log_queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        super().stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def start_queue_logging(handlers, logger=None, level=logging.INFO, flush_interval: float = 1.0):
+    """
+    Route the records of logger (default: the root logger) through a queue to
+    handlers, which run on one background thread. Logging calls then only
+    enqueue the record. Returns the started LogListener; it is stopped, and
+    the handlers flushed and closed, at exit.
+    """
+    logger = logger if logger is not None else logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    listener = LogListener(log_queue, *handlers, flush_interval=flush_interval)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,41 @@
+import collections
+from tkinter import scrolledtext
+
+
+class LogView(scrolledtext.ScrolledText):
+    """
+    Text pane for log lines. append() may be called from any thread and only
+    queues the line; every `interval` ms the queued lines are inserted with a
+    single insert call, the oldest lines beyond max_lines are dropped and the
+    view follows the end unless the user scrolled up.
+    """
+    def __init__(self, parent, max_lines: int = 5000, interval: int = 100, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.max_lines = max_lines
+        self.interval = interval
+        self._pending = collections.deque()
+        self.after(self.interval, self._flush)
+
+    def append(self, text: str, tag: str = "normal"):
+        self._pending.append((text, tag))
+
+    def clear(self):
+        self._pending.clear()
+        self.delete("1.0", "end")
+
+    def _flush(self):
+        try:
+            if self._pending:
+                chunks = []
+                while self._pending:
+                    chunks.extend(self._pending.popleft())
+                follow = self.yview()[1] >= 0.999
+                self.insert("end", *chunks)
+                # Every line ends with a newline, so the last line of the widget is empty
+                lines = int(self.index("end-1c").split(".")[0]) - 1
+                if self.max_lines and lines > self.max_lines:
+                    self.delete("1.0", f"{lines - self.max_lines + 1}.0")
+                if follow:
+                    self.see("end")
+        finally:
+            self.after(self.interval, self._flush)
@@ -0,0 +1,68 @@
+import fnmatch
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ModelEntry:
+    """One line of a model list such as `AS XNNNNYY AAAA/BBBBBB/CC/DD`."""
+    model: str
+    line_no: int
+    # Every whitespace separated column of the line, the model included
+    fields: list = field(default_factory=list)
+
+    @property
+    def extra(self):
+        """Columns after the model."""
+        return self.fields[2:]
+
+    def display(self, index: int):
+        return f"{index:>6}. {self.model:<16}{' '.join(self.extra)}"
+
+
+def parse_filter_text(text: str):
+    """
+    Split "X5*, B9*, !*JA" into include patterns and exclude patterns (the ones
+    starting with "!").
+    """
+    include, exclude = [], []
+    for pattern in (text or "").replace(";", ",").split(","):
+        pattern = pattern.strip()
+        if pattern.startswith("!"):
+            if pattern[1:].strip():
+                exclude.append(pattern[1:].strip())
+        elif pattern:
+            include.append(pattern)
+    return include, exclude
+
+
+def _matches(model: str, patterns):
+    model = model.upper()
+    return any(fnmatch.fnmatchcase(model, pattern.upper()) for pattern in patterns)
+
+
+def iter_model_entries(path: str, include=None, exclude=None, unique: bool = True):
+    """
+    Stream the entries of a model list in file order. Lines with fewer than two
+    columns are skipped. include / exclude are shell-style patterns matched
+    case-insensitively against the model: a model must match one include
+    pattern (when any are given) and no exclude pattern. With unique, only the
+    first line of each model is kept.
+    """
+    seen = set()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line_no, line in enumerate(f, 1):
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            model = parts[1]
+            if include and not _matches(model, include):
+                continue
+            if exclude and _matches(model, exclude):
+                continue
+            if unique:
+                key = model.upper()
+                if key in seen:
+                    continue
+                seen.add(key)
+            yield ModelEntry(model=model, line_no=line_no, fields=parts)
+
@@ -0,0 +1,121 @@
+import logging
+import queue
+import threading
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline. func(item) is called on `workers` threads and
+    returns True to hand the item to the next stage, or False when the item
+    is finished early (for example when there is nothing to download).
+    """
+    def __init__(self, name: str, func, workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+
+class Pipeline:
+    """
+    Producer/consumer pipeline with a bounded queue in front of every stage,
+    so a slow stage applies back-pressure instead of buffering everything.
+    Throughput is limited by the slowest stage, not the sum of all stages.
+    """
+    def __init__(self, stages, queue_size: int = 4, on_error=None, cancel_event=None):
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+        self.on_error = on_error
+        self.cancelled = cancel_event if cancel_event is not None else threading.Event()
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self._output = queue.Queue()
+        self._threads = []
+
+    def _put(self, q, item):
+        # Bounded put that still notices cancellation
+        while True:
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                if self.cancelled.is_set() and item is not _DONE:
+                    return False
+
+    def _feed(self, items):
+        try:
+            for item in items:
+                if self.cancelled.is_set() or not self._put(self._queues[0], item):
+                    break
+        finally:
+            for _ in range(self.stages[0].workers):
+                self._put(self._queues[0], _DONE)
+
+    def _work(self, index, remaining, remaining_lock):
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        is_last = index == len(self.stages) - 1
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            forward = False
+            if not self.cancelled.is_set():
+                try:
+                    forward = bool(stage.func(item))
+                except Exception as e:
+                    if self.on_error is not None:
+                        self.on_error(item, stage.name, e)
+                    else:
+                        logging.error(f"Stage {stage.name} failed: {e}")
+            if forward and not is_last:
+                if not self._put(self._queues[index + 1], item):
+                    self._output.put(item)
+            else:
+                self._output.put(item)
+        with remaining_lock:
+            remaining[index] -= 1
+            last_worker = remaining[index] == 0
+        if last_worker:
+            if is_last:
+                self._output.put(_DONE)
+            else:
+                for _ in range(self.stages[index + 1].workers):
+                    self._put(self._queues[index + 1], _DONE)
+
+    def run(self, items):
+        """
+        Push items through every stage and yield each one once it leaves the
+        pipeline, in completion order. Closing the generator cancels the run:
+        queued items are passed through unprocessed and in-flight ones finish.
+        """
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                t = threading.Thread(
+                    target=self._work, args=(index, remaining, remaining_lock),
+                    name=f"{stage.name}-{n + 1}", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+        feeder = threading.Thread(target=self._feed, args=(items,), name="pipeline-feed", daemon=True)
+        feeder.start()
+        self._threads.append(feeder)
+        drained = False
+        try:
+            while True:
+                item = self._output.get()
+                if item is _DONE:
+                    drained = True
+                    break
+                yield item
+        finally:
+            # Only an abandoned run cancels; the event may be shared with the caller
+            if not drained:
+                self.cancel()
+            for t in self._threads:
+                t.join()
+
+    def cancel(self):
+        self.cancelled.set()
@@ -0,0 +1,187 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Responses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = (429, 503)
+
+DEFAULT_LIMITS = {
+    "rate": 0,               # requests per second, 0 = unlimited
+    "burst": 4,              # requests allowed back to back
+    "min_concurrency": 1,
+    "initial_concurrency": 2,
+    "max_concurrency": 8,
+    "latency_target": 5.0,   # seconds to the first byte before backing off
+}
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average and `burst` back to back."""
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_time(self):
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self, cancel_event=None):
+        if self.rate <= 0 and not self.paused_until:
+            return
+        while True:
+            with self._lock:
+                wait = self._wait_time() if self.rate > 0 else max(0.0, self.paused_until - time.monotonic())
+            if wait <= 0:
+                return
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    raise InterruptedError("Cancelled while waiting for the rate limiter")
+            else:
+                time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hand out no token for the next `seconds`, e.g. after a Retry-After."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on requests in flight: +1/limit per fast success (about +1 per
+    round trip), halved on an error, a throttle response or a response slower
+    than latency_target, at most once per observed latency.
+    """
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8, latency_target=None, decrease: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, cancel_event=None):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise InterruptedError("Cancelled while waiting for a request slot")
+                self._cond.wait(0.2)
+            self.in_flight += 1
+
+    def release(self, ok: bool, latency: float):
+        with self._cond:
+            self.in_flight -= 1
+            slow = self.latency_target is not None and latency > self.latency_target
+            now = time.monotonic()
+            if not ok or slow:
+                if now - self._last_decrease >= latency:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class Outcome:
+    """Filled in by the caller of HostLimiter.slot() to report how the request went."""
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latency = None
+        self.throttled = False
+        self.retry_after = None
+
+    def responded(self):
+        """Mark the arrival of the response headers; the time to here is the latency."""
+        self.latency = time.monotonic() - self.started
+
+    def throttle(self, retry_after=None):
+        self.throttled = True
+        self.retry_after = retry_after
+
+
+class HostLimiter:
+    """Token bucket plus adaptive concurrency for the requests to one host."""
+    def __init__(self, host: str, limits: dict):
+        self.host = host
+        self.bucket = TokenBucket(limits["rate"], limits["burst"])
+        self.concurrency = AdaptiveConcurrency(
+            initial=limits["initial_concurrency"],
+            minimum=limits["min_concurrency"],
+            maximum=limits["max_concurrency"],
+            latency_target=limits["latency_target"],
+        )
+
+    @contextmanager
+    def slot(self, cancel_event=None):
+        """
+        Wait for a token and a free slot, then yield an Outcome. Leaving the
+        block with an exception counts as an error for the AIMD controller.
+        """
+        self.bucket.acquire(cancel_event)
+        self.concurrency.acquire(cancel_event)
+        outcome = Outcome()
+        ok = False
+        try:
+            yield outcome
+            ok = not outcome.throttled
+        finally:
+            latency = outcome.latency if outcome.latency is not None else time.monotonic() - outcome.started
+            self.concurrency.release(ok, latency)
+            if outcome.throttled:
+                pause = outcome.retry_after if outcome.retry_after is not None else latency
+                self.bucket.pause(pause)
+                logging.warning(f"{self.host} is throttling requests; concurrency now {int(self.concurrency.limit)}")
+
+
+class RateLimiter:
+    """
+    Per-host limiters. limits maps a host name (or "default") to overrides of
+    DEFAULT_LIMITS.
+    """
+    def __init__(self, limits=None):
+        self.limits = limits or {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, host: str):
+        host = host.lower()
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                settings = dict(DEFAULT_LIMITS)
+                settings.update(self.limits.get("default", {}))
+                settings.update(self.limits.get(host, {}))
+                limiter = HostLimiter(host, settings)
+                self._hosts[host] = limiter
+            return limiter
+
+    def for_url(self, url: str):
+        return self.for_host(urlsplit(url).hostname or "")
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+
+from http_resolver import BiosRelease
+
+CACHE_FILENAME = ".remote_versions.json"
+
+
+class RemoteVersionCache:
+    """
+    Last published BIOS release seen for each model, with the ETag,
+    Last-Modified and content hash of the lookup and when it was checked.
+    Stored as JSON next to the BIOS images.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, model: str):
+        with self._lock:
+            return self.entries.get(model.upper())
+
+    def is_fresh(self, entry, ttl: float):
+        return entry is not None and time.time() - entry.get("checked_at", 0) < ttl
+
+    def release_for(self, entry):
+        return BiosRelease(**entry["release"])
+
+    def store(self, model: str, release: BiosRelease, etag=None, last_modified=None, content_hash=None):
+        with self._lock:
+            self.entries[model.upper()] = {
+                "release": asdict(release),
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_hash": content_hash,
+                "checked_at": time.time(),
+            }
+
+    def touch(self, model: str):
+        with self._lock:
+            entry = self.entries.get(model.upper())
+            if entry is not None:
+                entry["checked_at"] = time.time()
+
+    def save(self):
+        with self._lock:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+    def check(self, model: str, resolver, ttl: float, force: bool = False, cancel_event=None):
+        """
+        Return (release, source) for the latest published BIOS of model.
+        source is "cache" when the entry is younger than ttl seconds and no
+        request was made, "not_modified" when a conditional request came back
+        304 or with an identical payload, and "fetched" otherwise.
+        cancel_event is passed on to the resolver's lookups.
+        """
+        entry = self.get(model)
+        if not force and self.is_fresh(entry, ttl):
+            return self.release_for(entry), "cache"
+        if entry is not None:
+            lookup = resolver.lookup(model, etag=entry.get("etag"), last_modified=entry.get("last_modified"),
+                                     cancel_event=cancel_event)
+        else:
+            lookup = resolver.lookup(model, cancel_event=cancel_event)
+        if entry is not None and (lookup.not_modified or
+                                  (lookup.content_hash and lookup.content_hash == entry.get("content_hash"))):
+            self.touch(model)
+            return self.release_for(entry), "not_modified"
+        if lookup.not_modified:
+            # 304 without a cached entry to fall back on; ask again unconditionally
+            lookup = resolver.lookup(model, cancel_event=cancel_event)
+        release = lookup.releases[0]
+        self.store(model, release, etag=lookup.etag, last_modified=lookup.last_modified,
+                   content_hash=lookup.content_hash)
+        logging.info(f"Published BIOS for {model}: {release.version}")
+        return release, "fetched"
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_remote_cache(folder: str):
+    """Shared RemoteVersionCache for a BIOS folder, loaded once per process."""
+    path = os.path.abspath(os.path.join(folder, CACHE_FILENAME))
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = RemoteVersionCache(path)
+            _caches[path] = cache
+        return cache
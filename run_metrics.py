@@ -0,0 +1,142 @@
+import cProfile
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+def add_timing(job, phase: str, seconds: float):
+    job.timings[phase] = job.timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def span(job, phase: str):
+    """Add the wall-clock time of the with-block to job.timings[phase]."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(job, phase, time.perf_counter() - started)
+
+
+@contextmanager
+def profiled(enabled: bool, output_path: str):
+    """
+    Run the with-block under cProfile and dump the stats to output_path
+    (open with pstats or snakeviz). Does nothing when enabled is False.
+    """
+    if not enabled:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        folder = os.path.dirname(output_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        profiler.dump_stats(output_path)
+        logging.info(f"Profile written to {output_path}")
+
+
+def percentile(values, q: float):
+    """Nearest-rank percentile of values (0 < q <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def phase_summary(jobs):
+    """Per phase: number of models, total seconds, p50 and p95."""
+    by_phase = {}
+    for job in jobs:
+        for phase, seconds in job.timings.items():
+            by_phase.setdefault(phase, []).append(seconds)
+    return {
+        phase: {
+            "count": len(values),
+            "total": round(sum(values), 3),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+        }
+        for phase, values in sorted(by_phase.items())
+    }
+
+
+def format_summary(summary):
+    lines = [f"{'phase':<16}{'count':>7}{'p50 s':>10}{'p95 s':>10}{'total s':>11}"]
+    for phase, stats in summary.items():
+        lines.append(f"{phase:<16}{stats['count']:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['total']:>11.3f}")
+    return "\n".join(lines)
+
+
+def prometheus_text(jobs, run_seconds: Optional[float] = None):
+    """
+    Render a run in the Prometheus text exposition format, suitable for the
+    node_exporter textfile collector.
+    """
+    lines = [
+        "# HELP bios_phase_seconds Seconds spent per phase, summarised over the models of the last run.",
+        "# TYPE bios_phase_seconds summary",
+    ]
+    for phase, stats in phase_summary(jobs).items():
+        lines.append(f'bios_phase_seconds{{phase="{phase}",quantile="0.5"}} {stats["p50"]}')
+        lines.append(f'bios_phase_seconds{{phase="{phase}",quantile="0.95"}} {stats["p95"]}')
+        lines.append(f'bios_phase_seconds_sum{{phase="{phase}"}} {stats["total"]}')
+        lines.append(f'bios_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+    statuses = {}
+    for job in jobs:
+        statuses[job.status] = statuses.get(job.status, 0) + 1
+    lines.append("# HELP bios_models Models of the last run by final status.")
+    lines.append("# TYPE bios_models gauge")
+    for status, count in sorted(statuses.items()):
+        lines.append(f'bios_models{{status="{status}"}} {count}')
+    lines.append("# HELP bios_downloaded_bytes Bytes downloaded in the last run.")
+    lines.append("# TYPE bios_downloaded_bytes gauge")
+    lines.append(f"bios_downloaded_bytes {sum(job.bytes_downloaded for job in jobs)}")
+    if run_seconds is not None:
+        lines.append("# HELP bios_run_seconds Wall-clock duration of the last run.")
+        lines.append("# TYPE bios_run_seconds gauge")
+        lines.append(f"bios_run_seconds {round(run_seconds, 3)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, jobs, run_seconds: Optional[float] = None):
+    # Write then rename so a scraper never reads a half-written file
+    tmp_path = path + ".tmp"
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(jobs, run_seconds))
+    os.replace(tmp_path, path)
+
+
+class JsonLinesWriter:
+    """Appends one JSON object per finished model to a metrics file."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def write(self, job):
+        record = {
+            "ts": round(time.time(), 3),
+            "model": job.model,
+            "status": job.status,
+            "bytes": job.bytes_downloaded,
+            "timings": {phase: round(seconds, 4) for phase, seconds in job.timings.items()},
+        }
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
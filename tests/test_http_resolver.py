@@ -0,0 +1,161 @@
+"""
+BiosResolver against a local stub server that replays the recorded GetPDBIOS
+response and support page in tests/fixtures, e.g.
+
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures")
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from http_resolver import BiosResolver, ResolveError, parse_bios_html  # noqa: E402
+
+MODEL = "X515JA"
+API_ETAG = '"x515ja-312"'
+
+
+def read_fixture(name: str):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class StubSite:
+    """
+    Serves the fixtures of MODEL: the API at the GetPDBIOS path, the page at
+    /supportonly/<model>/helpdesk_bios/. api_status other than 200 makes the
+    API fail, so the resolver has to fall back to the page.
+    """
+    def __init__(self):
+        self.api_status = 200
+        self.requests = []
+        self.api_body = read_fixture("getpdbios_x515ja.json")
+        self.page_body = read_fixture("helpdesk_bios_x515ja.html")
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site.requests.append(self.path)
+                if self.path.startswith("/support/api/product.asmx/GetPDBIOS") and f"model={MODEL.lower()}" in self.path:
+                    if site.api_status != 200:
+                        return self._send(site.api_status, b"", "text/plain")
+                    if self.headers.get("If-None-Match") == API_ETAG:
+                        return self._send(304, b"", "application/json")
+                    return self._send(200, site.api_body, "application/json", {"ETag": API_ETAG})
+                if self.path == f"/supportonly/{MODEL.lower()}/helpdesk_bios/":
+                    return self._send(200, site.page_body, "text/html")
+                self._send(404, b"", "text/plain")
+
+            def _send(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class BiosResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.site = StubSite().start()
+        self.resolver = BiosResolver(base_url=self.site.url, retries=0)
+
+    def tearDown(self):
+        self.resolver.pool.close()
+        self.site.stop()
+
+    def assert_ez_flash_releases(self, releases):
+        self.assertEqual([r.version for r in releases], [312, 310, 306])
+        latest = releases[0]
+        self.assertEqual(latest.model, MODEL)
+        self.assertEqual(latest.title, "X515JA BIOS 312")
+        self.assertEqual(latest.release_date, "2024/03/12")
+        self.assertEqual(latest.size, "7.93 MBytes")
+        self.assertEqual(latest.section, "BIOS for ASUS EZ Flash Utility")
+        self.assertTrue(latest.download_url.startswith("https://dlcdnets.asus.com/"))
+        self.assertEqual(latest.filename, "X515JAAS312.zip")
+
+    def test_json_api(self):
+        lookup = self.resolver.lookup(MODEL)
+        self.assert_ez_flash_releases(lookup.releases)
+        self.assertEqual(lookup.etag, API_ETAG)
+        self.assertTrue(lookup.content_hash)
+        self.assertFalse(any("helpdesk_bios" in path for path in self.site.requests))
+
+    def test_json_api_not_modified(self):
+        lookup = self.resolver.lookup(MODEL, etag=API_ETAG)
+        self.assertTrue(lookup.not_modified)
+        self.assertEqual(lookup.releases, [])
+
+    def test_json_api_all_sections(self):
+        releases = self.resolver.lookup(MODEL, section_name=None).releases
+        self.assertEqual(sorted({r.section for r in releases}),
+                         ["BIOS Update (Windows)", "BIOS for ASUS EZ Flash Utility"])
+        self.assertEqual(len(releases), 4)
+
+    def test_page_fallback(self):
+        self.site.api_status = 500
+        lookup = self.resolver.lookup(MODEL)
+        self.assert_ez_flash_releases(lookup.releases)
+        self.assertIn(f"/supportonly/{MODEL.lower()}/helpdesk_bios/", self.site.requests)
+
+    def test_page_fallback_all_sections(self):
+        self.site.api_status = 503
+        releases = self.resolver.lookup(MODEL, section_name=None).releases
+        self.assertEqual(len(releases), 4)
+
+    def test_page_matches_api(self):
+        from_api = self.resolver.resolve(MODEL)
+        self.site.api_status = 500
+        self.assertEqual(self.resolver.resolve(MODEL), from_api)
+
+    def test_unknown_model(self):
+        with self.assertRaises(ResolveError):
+            self.resolver.resolve("NOPE01")
+
+
+class ParseBiosHtmlTest(unittest.TestCase):
+    def test_compact_and_pretty_printed_json(self):
+        pretty = read_fixture("helpdesk_bios_x515ja.html").decode("utf-8")
+        compact = pretty.replace('"Name": "', '"Name":"')
+        self.assertEqual(len(parse_bios_html(pretty, MODEL)), 3)
+        self.assertEqual(parse_bios_html(compact, MODEL), parse_bios_html(pretty, MODEL))
+
+    def test_no_payload(self):
+        self.assertEqual(parse_bios_html("<html><body>Not found</body></html>", MODEL), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
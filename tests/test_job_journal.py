@@ -0,0 +1,157 @@
+"""
+JobJournal replay and expiry, and resuming a run from its journal, e.g.
+
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from dataclasses import asdict
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import bios_core  # noqa: E402
+from http_resolver import BiosRelease  # noqa: E402
+from job_journal import JOURNAL_FILENAME, JobJournal  # noqa: E402
+
+DAY = 24 * 3600
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="bios-journal-")
+        self.path = os.path.join(self.folder, JOURNAL_FILENAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def read_lines(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def write_lines(self, lines):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+class ReplayTest(JournalTestCase):
+    def test_replays_latest_state(self):
+        journal = JobJournal(self.path)
+        journal.begin(["A", "B"])
+        journal.record("A", "resolved", old_version=301)
+        journal.record("A", "done", status="success", new_version=302)
+        journal.record("B", "downloading")
+        journal.close()
+        replayed = JobJournal(self.path)
+        self.assertEqual(replayed.get("A")["state"], "done")
+        self.assertEqual(replayed.get("A")["new_version"], 302)
+        self.assertEqual(replayed.get("B")["state"], "downloading")
+        self.assertEqual(replayed.unfinished(["A", "B"], max_attempts=3), ["B"])
+
+    def test_torn_last_line(self):
+        journal = JobJournal(self.path)
+        journal.begin(["A"])
+        journal.record("A", "resolved", old_version=301)
+        journal.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"model": "A", "state": "downl')
+        replayed = JobJournal(self.path)
+        self.assertEqual(replayed.get("A")["state"], "resolved")
+        self.assertEqual(replayed.get("A")["old_version"], 301)
+
+    def test_failures_keep_attempt_count(self):
+        journal = JobJournal(self.path)
+        journal.begin(["A"])
+        job = bios_core.ModelJob(model="A", status="failed", error="boom")
+        self.assertEqual(journal.record_failure(job, backoff=10)[0], 1)
+        journal.record("A", "pending")
+        self.assertEqual(journal.record_failure(job, backoff=10), (2, 20))
+        journal.close()
+        self.assertEqual(JobJournal(self.path).get("A")["attempts"], 2)
+
+
+class MaxAgeTest(JournalTestCase):
+    def finished_journal(self):
+        journal = JobJournal(self.path)
+        journal.begin(["A"])
+        journal.record("A", "done", status="success")
+        journal.close()
+
+    def test_begin_writes_start_header(self):
+        self.finished_journal()
+        header = json.loads(self.read_lines()[0])
+        self.assertAlmostEqual(header["started"], time.time(), delta=60)
+        self.assertEqual(JobJournal(self.path, max_age=DAY).get("A")["state"], "done")
+
+    def test_old_run_is_ignored(self):
+        self.finished_journal()
+        lines = self.read_lines()
+        lines[0] = json.dumps({"started": time.time() - 5 * DAY})
+        self.write_lines(lines)
+        self.assertIsNone(JobJournal(self.path, max_age=DAY).get("A"))
+        # Without max_age any journal is resumed
+        self.assertEqual(JobJournal(self.path).get("A")["state"], "done")
+
+    def test_restart_records_new_start(self):
+        self.write_lines([json.dumps({"started": time.time() - 5 * DAY}),
+                          json.dumps({"model": "A", "state": "done", "ts": time.time() - 5 * DAY})])
+        journal = JobJournal(self.path, max_age=DAY)
+        journal.begin(["A"])
+        journal.close()
+        self.assertEqual(journal.get("A")["state"], "pending")
+        self.assertAlmostEqual(json.loads(self.read_lines()[0])["started"], time.time(), delta=60)
+
+    def test_journal_without_header_counts_from_oldest_record(self):
+        now = time.time()
+        self.write_lines([json.dumps({"model": "A", "state": "done", "ts": now - 3 * DAY}),
+                          json.dumps({"model": "B", "state": "done", "ts": now})])
+        self.assertIsNone(JobJournal(self.path, max_age=DAY).get("B"))
+        self.write_lines([json.dumps({"model": "A", "state": "done", "ts": now - 3600})])
+        self.assertEqual(JobJournal(self.path, max_age=DAY).get("A")["state"], "done")
+
+
+class ResumeTest(JournalTestCase):
+    def setUp(self):
+        super().setUp()
+        # Nothing listens on port 9: any request the run makes fails the model
+        bios_core.apply_config({"download_path": self.folder, "resolver": "http",
+                                "asus_base_url": "http://127.0.0.1:9", "archive_cache_mb": 0,
+                                "request_retries": 0, "remote_cache_ttl_hours": 0})
+
+    def tearDown(self):
+        bios_core.apply_config({})
+        super().tearDown()
+
+    def test_extracted_job_with_removed_archive(self):
+        release = BiosRelease(model="X515JA", version=312, download_url="http://127.0.0.1:9/X515JAAS312.zip")
+        image = os.path.join(self.folder, "X515JAAS.312")
+        with open(image, "wb") as f:
+            f.write(b"\0" * 64)
+        journal = JobJournal(self.path)
+        journal.begin(["X515JA"])
+        journal.record("X515JA", "resolved", old_version=310, release=asdict(release),
+                       archive_path=os.path.join(self.folder, "X515JAAS312.zip"), bytes=1024)
+        journal.record("X515JA", "extracted", extracted=[image])
+        journal.close()
+
+        resumed = bios_core.job_from_journal("X515JA", JobJournal(self.path).get("X515JA"))
+        self.assertIsNone(resumed.archive_path)
+        self.assertEqual(resumed.extracted, [image])
+        self.assertEqual(resumed.release, release)
+
+        jobs = list(bios_core.run_models(["X515JA"], self.folder, None, journal=JobJournal(self.path)))
+        self.assertEqual([(job.status, job.old_version, job.new_version) for job in jobs],
+                         [("success", 310, 312)])
+        # A completed run moves its journal aside
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path + ".last"))
+
+
+if __name__ == "__main__":
+    unittest.main()
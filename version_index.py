@@ -0,0 +1,339 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+INDEX_FILENAME = ".bios_index.json"
+INDEX_FORMAT = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+# Seconds between writes of the index file while files are being added; flush() writes the rest
+SAVE_INTERVAL = 30.0
+
+
+def extract_bios_version_from_filename(filename: str):
+    """
+    Check if the BIOS filename is in the format XXXXXX.NNN,
+    where NNN is the version number, and return the version as int.
+    Returns None if not matched.
+    """
+    match = re.match(r"^[A-Za-z0-9]+\.([0-9]{3})$", filename)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def file_sha256(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VersionIndex:
+    """
+    Persistent index of the BIOS images in one folder: file name -> version,
+    size, mtime and SHA-256. It lives in the folder as .bios_index.json, whose
+    own mtime is set to the folder's mtime on save, so the folder is only
+    rescanned when one stat() shows it changed since. Changes made inside
+    writing() are the caller's own and do not trigger a rescan.
+    Hashes are computed when a file is added, or on demand for files found by
+    a scan. Additions are written to disk every save_interval seconds and by
+    flush().
+    """
+    def __init__(self, folder: str, save_interval: float = SAVE_INTERVAL):
+        self.folder = folder
+        self.path = os.path.join(folder, INDEX_FILENAME)
+        self.save_interval = save_interval
+        self.entries = {}
+        self._names = []
+        self._by_lower = {}
+        # For duplicate detection: size -> names, (size, sha256) -> name
+        self._by_size = {}
+        self._by_content = {}
+        self._dir_mtime = None
+        self._writers = 0
+        self._expected = set()
+        self._stale = False
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._load()
+
+    def _folder_mtime(self):
+        return os.stat(self.folder).st_mtime_ns
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == INDEX_FORMAT:
+                self.entries = data.get("entries", {})
+                self._dir_mtime = os.stat(self.path).st_mtime_ns
+        except (OSError, ValueError):
+            self.entries = {}
+        self._reindex()
+        self.revalidate()
+
+    def _reindex(self):
+        self._by_lower = {name.lower(): name for name in self.entries}
+        self._names = sorted(self._by_lower)
+        self._by_size = {}
+        self._by_content = {}
+        for name, entry in self.entries.items():
+            self._index_content(name, entry)
+
+    def _index_content(self, name: str, entry):
+        self._by_size.setdefault(entry["size"], set()).add(name)
+        if entry.get("sha256"):
+            key = (entry["size"], entry["sha256"])
+            if not self._has_content(self._by_content.get(key), *key):
+                self._by_content[key] = name
+
+    def _has_content(self, name, size: int, sha256: str):
+        entry = self.entries.get(name) if name is not None else None
+        return entry is not None and entry["size"] == size and entry.get("sha256") == sha256
+
+    def revalidate(self):
+        """
+        Rescan the folder if anything changed since the index was written,
+        unless the change is a write in progress (see writing()).
+        """
+        with self._lock:
+            try:
+                current = self._folder_mtime()
+            except FileNotFoundError:
+                return
+            if self._stale and not self._writers and not self._expected:
+                self.rebuild()
+            elif current == self._dir_mtime:
+                return
+            elif self._writers or self._expected:
+                # Our own extraction; its files are recorded by add_files()
+                self._dir_mtime = current
+            else:
+                self.rebuild()
+
+    @contextmanager
+    def writing(self):
+        """
+        Block in which the caller writes files into the folder and yields a
+        list to extend with their paths. Until those are passed to
+        add_files() (or flush()), lookups accept the folder's changed mtime
+        instead of rescanning it. If the block raises, the next lookup after
+        all writes are done rescans the folder once.
+        """
+        written = []
+        with self._lock:
+            self._writers += 1
+        try:
+            yield written
+        except BaseException:
+            with self._lock:
+                self._stale = True
+            raise
+        finally:
+            with self._lock:
+                self._writers -= 1
+                self._expected.update(os.path.abspath(path) for path in written)
+
+    def rebuild(self):
+        """Scan the folder once with os.scandir, keeping hashes of unchanged files."""
+        with self._lock:
+            previous = self.entries
+            entries = {}
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    version = extract_bios_version_from_filename(entry.name)
+                    if version is None or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    old = previous.get(entry.name)
+                    sha256 = None
+                    if old and old.get("size") == st.st_size and old.get("mtime") == st.st_mtime_ns:
+                        sha256 = old.get("sha256")
+                    entries[entry.name] = {
+                        "version": version,
+                        "size": st.st_size,
+                        "mtime": st.st_mtime_ns,
+                        "sha256": sha256,
+                    }
+            self.entries = entries
+            self._stale = False
+            self._reindex()
+            logging.info(f"Indexed {len(entries)} BIOS images in {self.folder}")
+            self.save()
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"format": INDEX_FORMAT, "entries": self.entries}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            # Writing the index touches the folder, so stamp it afterwards
+            self._dir_mtime = self._folder_mtime()
+            # Files still being written are not in the index yet; a stamp would hide them from the next load
+            stamp = 0 if self._writers or self._expected or self._stale else self._dir_mtime
+            os.utime(self.path, ns=(stamp, stamp))
+
+    def flush(self):
+        """Record files left by writing() blocks and write pending changes to disk."""
+        with self._lock:
+            if self._expected:
+                self.add_files(list(self._expected))
+            if self._dirty:
+                self.save()
+
+    def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def _duplicate_of(self, name: str, size: int, sha256: str):
+        """
+        Another indexed image with this content. Images found by a scan are
+        not hashed yet; those of the same size are hashed now.
+        """
+        other = self._by_content.get((size, sha256))
+        if other != name and self._has_content(other, size, sha256):
+            return other
+        for other in sorted(self._by_size.get(size, ())):
+            entry = self.entries.get(other)
+            if other == name or entry is None or entry["size"] != size or entry.get("sha256") is not None:
+                continue
+            try:
+                if self.sha256_for(other) == sha256:
+                    return other
+            except OSError:
+                continue
+        return None
+
+    def _link(self, path: str, existing: str):
+        # Swap the new copy for a hard link to the identical image already in the folder
+        tmp_path = path + ".link"
+        try:
+            os.link(os.path.join(self.folder, existing), tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logging.info(f"Could not hard link {os.path.basename(path)} to {existing}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def add_files(self, paths, link_duplicates: bool = False):
+        """
+        Record freshly extracted files without rescanning the folder. With
+        link_duplicates, a file identical to an indexed image of another name
+        is replaced by a hard link to it, so the content is stored once.
+        """
+        with self._lock:
+            changed = False
+            for path in paths:
+                self._expected.discard(os.path.abspath(path))
+                if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.folder):
+                    continue
+                name = os.path.basename(path)
+                version = extract_bios_version_from_filename(name)
+                if version is None or not os.path.isfile(path):
+                    continue
+                sha256 = file_sha256(path)
+                st = os.stat(path)
+                if link_duplicates:
+                    existing = self._duplicate_of(name, st.st_size, sha256)
+                    if existing is not None and self._link(path, existing):
+                        logging.info(f"{name} is identical to {existing}, stored once as a hard link")
+                        st = os.stat(path)
+                old = self.entries.get(name)
+                if old is not None:
+                    self._by_size.get(old["size"], set()).discard(name)
+                self.entries[name] = {
+                    "version": version,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime_ns,
+                    "sha256": sha256,
+                }
+                self._index_content(name, self.entries[name])
+                lower = name.lower()
+                if lower not in self._by_lower:
+                    bisect.insort(self._names, lower)
+                self._by_lower[lower] = name
+                changed = True
+            if changed:
+                # The folder changed by our own hand (extraction, hard links); no rescan needed
+                self._dir_mtime = self._folder_mtime()
+                self._changed()
+
+    def _matching_names(self, model: str):
+        prefix = model.lower()
+        i = bisect.bisect_left(self._names, prefix)
+        while i < len(self._names) and self._names[i].startswith(prefix):
+            yield self._names[i]
+            i += 1
+
+    def lookup(self, model: str):
+        """
+        Return (file name, entry) of the newest image whose name starts with
+        model, or None.
+        """
+        with self._lock:
+            self.revalidate()
+            best = None
+            for lower in self._matching_names(model):
+                name = self._by_lower[lower]
+                entry = self.entries[name]
+                if best is None or entry["version"] > best[1]["version"]:
+                    best = (name, entry)
+            return best
+
+    def version_for(self, model: str):
+        found = self.lookup(model)
+        return found[1]["version"] if found else None
+
+    def versions_for(self, model: str):
+        """Every version of model with an image in the folder."""
+        with self._lock:
+            self.revalidate()
+            return {self.entries[self._by_lower[lower]]["version"] for lower in self._matching_names(model)}
+
+    def sha256_for(self, name: str):
+        """SHA-256 of an indexed file, hashing it now if the scan skipped it."""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return None
+            if entry.get("sha256") is None:
+                entry["sha256"] = file_sha256(os.path.join(self.folder, name))
+                self._index_content(name, entry)
+                self._changed()
+            return entry["sha256"]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_version_index(folder: str):
+    """Shared VersionIndex for folder, loaded once per process."""
+    key = os.path.abspath(folder)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = VersionIndex(folder)
+            _indexes[key] = index
+        return index
+
+
+def flush_version_indexes():
+    """Flush every index loaded by get_version_index; runs call this when they end."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.flush()
@@ -0,0 +1,89 @@
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+
+class VirtualListView(ttk.Frame):
+    """
+    Read-only list for tens of thousands of rows. Only the rows in view exist
+    as canvas items, and they are reused while scrolling; row_text(index)
+    produces the text of a row on demand. set_count() and refresh() are
+    coalesced into one redraw per idle cycle, so appending rows in batches
+    costs one repaint per batch.
+    """
+    def __init__(self, parent, row_text=None, height: int = 6, font=('Consolas', 9)):
+        super().__init__(parent)
+        self.row_text = row_text or (lambda index: "")
+        self.count = 0
+        self.first = 0
+        self.max_chars = 0
+        self.font = tkfont.Font(font=font)
+        self.row_height = self.font.metrics("linespace") + 2
+        self.char_width = self.font.measure("0")
+        self._items = []
+        self._pending = None
+
+        self.canvas = tk.Canvas(self, height=height * self.row_height, background="white",
+                                highlightthickness=1, highlightbackground="#a0a0a0")
+        self.scroll_y = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self.scroll_x.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scroll_y.grid(row=0, column=1, sticky="ns")
+        self.scroll_x.grid(row=1, column=0, sticky="ew")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+    def page_size(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def set_count(self, count: int, max_chars: int = 0):
+        """Show rows 0..count-1; max_chars sizes the horizontal scroll range."""
+        self.count = count
+        self.max_chars = max(max_chars, self.max_chars) if count else 0
+        if not count:
+            self.first = 0
+        self.refresh()
+
+    def refresh(self):
+        if self._pending is None:
+            self._pending = self.after_idle(self._redraw)
+
+    def scroll_rows(self, rows: int):
+        self.first += rows
+        self.refresh()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * self.count)
+        elif args[0] == "scroll":
+            step = self.page_size() if args[2] == "pages" else 1
+            self.first += int(args[1]) * step
+        self.refresh()
+
+    def _on_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _redraw(self):
+        self._pending = None
+        page = self.page_size()
+        visible = page + 1
+        self.first = max(0, min(self.first, self.count - page))
+        while len(self._items) < visible:
+            self._items.append(self.canvas.create_text(4, 0, anchor="nw", font=self.font))
+        for i, item in enumerate(self._items):
+            index = self.first + i
+            text = self.row_text(index) if i < visible and index < self.count else ""
+            self.canvas.itemconfigure(item, text=text)
+            self.canvas.coords(item, 4, i * self.row_height + 1)
+        width = max(self.canvas.winfo_width(), self.max_chars * self.char_width + 8)
+        self.canvas.configure(scrollregion=(0, 0, width, self.canvas.winfo_height()))
+        if self.count:
+            self.scroll_y.set(self.first / self.count, min(1.0, (self.first + page) / self.count))
+        else:
+            self.scroll_y.set(0.0, 1.0)